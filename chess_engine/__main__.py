@@ -2,11 +2,29 @@ from argparse import ArgumentParser
 
 from chess_engine.game import game_loop
 from chess_engine.core.utils import setup_logging
+from chess_engine.perft import PERFT_SUITE, run_perft, run_suite
 
 
 if __name__ == "__main__":
     parser = ArgumentParser()
     parser.add_argument("-v", "--verbose", action="store_true")
+    subparsers = parser.add_subparsers(dest="command")
+    perft_parser = subparsers.add_parser("perft",
+                                         help="count the nodes of the move tree, to test and time move generation")
+    perft_parser.add_argument("--fen", default=PERFT_SUITE[0][1],
+                              help="position to search. Defaults to the starting position")
+    perft_parser.add_argument("--depth", type=int, default=3)
+    perft_parser.add_argument("--divide", action="store_true",
+                              help="print the node count below each root move")
+    perft_parser.add_argument("--suite", action="store_true",
+                              help="run the built-in positions with known node counts, up to --depth")
+    perft_parser.add_argument("--workers", type=int, default=1,
+                              help="number of processes to split the move tree across")
     args = parser.parse_args()
     setup_logging(verbose=args.verbose)
+    if args.command == "perft":
+        if args.suite:
+            exit(1 if run_suite(args.depth, workers=args.workers) else 0)
+        run_perft(args.fen, args.depth, show_divide=args.divide, workers=args.workers)
+        exit(0)
     exit(game_loop())
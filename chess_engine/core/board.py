@@ -1,5 +1,8 @@
 import sys
-from typing import List, Tuple, Optional, Iterator
+from typing import List, Tuple, Optional, Iterator, Set
+
+from .pst import EG_SCORES, MG_SCORES, PHASES, compute_eval
+from .zobrist import CASTLING_KEYS, EP_KEYS, PIECE_KEYS, SIDE_KEY, compute_hash
 
 PieceName = str
 Color = bool
@@ -21,6 +24,47 @@ KING = "K"
 
 PIECES = frozenset([PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING])
 
+# Integer piece codes, used for the internal board representation.
+# The low 3 bits hold the piece type and the next 2 bits hold the color.
+# Empty squares and guard regions have no color bits set.
+EMPTY = 0
+PAWN_CODE = 1
+KNIGHT_CODE = 2
+BISHOP_CODE = 3
+ROOK_CODE = 4
+QUEEN_CODE = 5
+KING_CODE = 6
+GUARD = 7
+
+TYPE_MASK = 7
+WHITE_FLAG = 8
+BLACK_FLAG = 16
+COLOR_MASK = WHITE_FLAG | BLACK_FLAG
+
+# indexed by color, since BLACK == 0 and WHITE == 1
+COLOR_FLAGS = (BLACK_FLAG, WHITE_FLAG)
+
+_RAW_CODES = {
+    PAWN: PAWN_CODE,
+    KNIGHT: KNIGHT_CODE,
+    BISHOP: BISHOP_CODE,
+    ROOK: ROOK_CODE,
+    QUEEN: QUEEN_CODE,
+    KING: KING_CODE,
+}
+
+# string piece name -> integer code
+NAME_TO_CODE = {E: EMPTY, G: GUARD}
+for _name, _raw in _RAW_CODES.items():
+    NAME_TO_CODE[_name] = _raw | WHITE_FLAG
+    NAME_TO_CODE[_name.lower()] = _raw | BLACK_FLAG
+
+# integer code -> string piece name
+_code_to_name = [""] * 32
+for _name, _code in NAME_TO_CODE.items():
+    _code_to_name[_code] = _name
+CODE_TO_NAME = tuple(_code_to_name)
+
 
 # the default board, with guard regions
 starter_board = [
@@ -38,112 +82,265 @@ starter_board = [
     G, G, G, G, G, G, G, G, G, G,
 ]
 
+STARTER_CODES = bytes(NAME_TO_CODE[piece] for piece in starter_board)
+
 BOARD_SIZE = len(starter_board)
 MIN_PIECE_INDEX = 21
 MAX_PIECE_INDEX = 98
 
 
+# castling rights, stored as a bitmask on the board
+CASTLE_WHITE_KING = 1
+CASTLE_WHITE_QUEEN = 2
+CASTLE_BLACK_KING = 4
+CASTLE_BLACK_QUEEN = 8
+ALL_CASTLING = 15
+
+
+def _build_castling_masks() -> bytes:
+    """Rights that survive a move touching each square.
+    Moving the king or a rook off its square, or capturing a rook on it, loses the right"""
+    masks = [ALL_CASTLING] * BOARD_SIZE
+    masks[95] &= ~(CASTLE_WHITE_KING | CASTLE_WHITE_QUEEN)
+    masks[98] &= ~CASTLE_WHITE_KING
+    masks[91] &= ~CASTLE_WHITE_QUEEN
+    masks[25] &= ~(CASTLE_BLACK_KING | CASTLE_BLACK_QUEEN)
+    masks[28] &= ~CASTLE_BLACK_KING
+    masks[21] &= ~CASTLE_BLACK_QUEEN
+    return bytes(masks)
+
+
+CASTLING_MASKS = _build_castling_masks()
+
+
 class Board:
-    def __init__(self, board: Optional[list] = None):
+    def __init__(self, board=None):
         """
-        Make a copy of the given board array
+        Make a copy of the given board array.
+        The board may be another Board, a list of piece names, or a bytearray of piece codes.
+        Internally the board is stored as a bytearray of integer piece codes.
         """
-        if board:
-            self._board = board[:]
+        if board is None:
+            self._board = bytearray(STARTER_CODES)
+        elif isinstance(board, Board):
+            self._board = bytearray(board._board)
+        elif isinstance(board, (bytes, bytearray)):
+            self._board = bytearray(board)
         else:
-            self._board = starter_board[:]
+            self._board = bytearray(NAME_TO_CODE[piece] for piece in board)
+
+        # squares occupied by each color, indexed by color
+        self._pieces: List[Set[int]] = [set(), set()]
+        # square of each king, indexed by color, -1 if there is no king
+        self._kings = [-1, -1]
+        for index in range(MIN_PIECE_INDEX, MAX_PIECE_INDEX + 1):
+            code = self._board[index]
+            if code & COLOR_MASK:
+                self._pieces[(code & WHITE_FLAG) >> 3].add(index)
+                if code & TYPE_MASK == KING_CODE:
+                    self._kings[(code & WHITE_FLAG) >> 3] = index
+
         # Move (but no typing for circular imports)
         self._moves = []  # type: list
-
-        # computed properties
-        self._ep_possible = False
-        # index of the pawn that just moved, the one that will be captured
-        self._ep_pawn_index = -1
-        # index of the place where the capturing pawn will move to
-        self._ep_capture_index = -1
-        self._ep_computed = False
-
-        self._check_computed = {
-            WHITE: False,
-            BLACK: False,
-        }
-        self._is_in_check = {
-            WHITE: False,
-            BLACK: False
-        }
+        # one undo record per entry in self._moves
+        self._undo = []  # type: List[tuple]
+
+        # index of the place where the capturing pawn will move to, -1 if en-passant is not possible
+        self._ep_index = -1
+        # without a history, assume any king and rook on their starting squares have not moved
+        self._castling = infer_castling_rights(self._board)
+
+        # cached result of is_in_check for each color, None if not computed yet
+        self._in_check = [None, None]  # type: List[Optional[bool]]
+
+        # side to move. Flipped by make_move
+        self._turn = WHITE
+        # Zobrist hash, kept up to date as pieces move
+        self._hash = compute_hash(self)
+        # running totals of the material and piece-square scores (white positive) and the game phase, see pst.py
+        self._mg, self._eg, self._phase = compute_eval(self._board)
+
+    @property
+    def hash(self) -> int:
+        """64-bit Zobrist hash of the position, including side to move, castling rights and en-passant file"""
+        return self._hash
+
+    @property
+    def turn(self) -> Color:
+        return self._turn
+
+    def set_state(self, turn: Color, castling: int, ep_index: int = -1) -> None:
+        """Set the side to move, castling rights and en-passant square, and rehash"""
+        self._turn = turn
+        self._castling = castling
+        self._ep_index = ep_index
+        self._in_check = [None, None]
+        self._hash = compute_hash(self)
 
     def __getitem__(self, index: int) -> PieceName:
-        return self._board[index]
+        return CODE_TO_NAME[self._board[index]]
 
     def __setitem__(self, index: int, piece: PieceName) -> None:
-        self._board[index] = piece
+        code = NAME_TO_CODE[piece]
+        self._remove_piece(index)
+        if code & COLOR_MASK:
+            self._put_piece(index, code)
+        else:
+            self._board[index] = code
 
     def __iter__(self) -> Iterator[PieceName]:
-        return iter(self._board)
+        return (CODE_TO_NAME[code] for code in self._board)
+
+    def _put_piece(self, index: int, code: int) -> None:
+        """Place the piece on an empty square, keeping the piece lists, king squares, hash and evaluation totals
+        up to date"""
+        self._board[index] = code
+        self._pieces[(code & WHITE_FLAG) >> 3].add(index)
+        self._hash ^= PIECE_KEYS[code][index]
+        self._mg += MG_SCORES[code][index]
+        self._eg += EG_SCORES[code][index]
+        self._phase += PHASES[code]
+        if code & TYPE_MASK == KING_CODE:
+            self._kings[(code & WHITE_FLAG) >> 3] = index
+
+    def _remove_piece(self, index: int) -> int:
+        """Empty the square, keeping the piece lists, king squares, hash and evaluation totals up to date.
+        Return the code of the removed piece"""
+        code = self._board[index]
+        if code & COLOR_MASK:
+            self._board[index] = EMPTY
+            color = (code & WHITE_FLAG) >> 3
+            self._pieces[color].discard(index)
+            self._hash ^= PIECE_KEYS[code][index]
+            self._mg -= MG_SCORES[code][index]
+            self._eg -= EG_SCORES[code][index]
+            self._phase -= PHASES[code]
+            if code & TYPE_MASK == KING_CODE and self._kings[color] == index:
+                self._kings[color] = -1
+        return code
+
+    def copy(self) -> "Board":
+        """Copy of the board, including the move history, side to move and en-passant and castling state"""
+        board = Board(self)
+        board._moves = self._moves[:]
+        board._undo = self._undo[:]
+        board._ep_index = self._ep_index
+        board._castling = self._castling
+        board._turn = self._turn
+        board._hash = self._hash
+        return board
 
     def add_move(self, move):
         self._moves.append(move)
 
     def set_check(self, color: Color, in_check: bool):
-        self._is_in_check[color] = in_check
-        self._check_computed[color] = True
+        self._in_check[color] = in_check
 
     def get_check(self, color: Color) -> bool:
-        assert self._check_computed[color]
-        return self._is_in_check[color]
-
-    def compute_ep_index(self) -> None:
-        """if en-passant is valid, there is precisely one index where capture is possible
-        Fill up the self._ep* variables
-        Additionally set self._ep_computed to true regardless
-        """
-        if self._moves == []:
-            # no previous moves
-            self._ep_possible = False
-            self._ep_computed = True
-            return
-        last_move = self._moves[-1]
-        if (get_raw_piece(last_move.piece) != PAWN or \
-                abs(index_to_row(last_move.src) - index_to_row(last_move.dest)) != 2):
-            # last move was not a 2-space pawn move
-            self._ep_possible = False
-            self._ep_computed = True
-            return
-        self._ep_possible = True
-        self._ep_computed = True
-        color = get_piece_color(last_move.piece)
-        dy = (1 if color == WHITE else -1)
-        self._ep_pawn_index = last_move.dest
-        self._ep_capture_index = slide_index(last_move.src, 0, dy)
+        in_check = self._in_check[color]
+        assert in_check is not None
+        return in_check
 
     def is_en_passant_possible(self) -> bool:
-        if not self._ep_computed:
-            self.compute_ep_index()
-        return self._ep_possible
+        return self._ep_index != -1
 
     def get_ep_capture_index(self) -> int:
-        if not self._ep_computed:
-            self.compute_ep_index()
-        return self._ep_capture_index
+        return self._ep_index
 
     def get_ep_pawn_index(self) -> int:
-        if not self._ep_computed:
-            self.compute_ep_index()
-        return self._ep_capture_index
+        """index of the pawn that just moved, the one that will be captured"""
+        if self._ep_index == -1:
+            return -1
+        elif index_to_row(self._ep_index) == 3:
+            return slide_index(self._ep_index, 0, 1)
+        else:
+            return slide_index(self._ep_index, 0, -1)
+
+    def can_castle(self, rights: int) -> bool:
+        """Return True iff any of the given castling rights are still available"""
+        return bool(self._castling & rights)
+
+    def make_move(self, move) -> None:
+        """Apply the move to this board in place.
+        The move is not checked for legality. Revert it with unmake_move"""
+        squares = self._board
+        src = move.src
+        dest = move.dest
+        piece = squares[src]
+        if move.is_en_passant:
+            captured_index = dest + (10 if piece & WHITE_FLAG else -10)
+        else:
+            captured_index = dest
+        self._undo.append((squares[captured_index], captured_index, self._ep_index, self._castling,
+                           self._in_check[0], self._in_check[1], self._hash))
+        self._moves.append(move)
 
-    def move_piece(self, move) -> None:
-        """Convenient way to add the given move"""
-        move_piece(self, move.src, move.dest,
+        # piece keys are updated as the pieces move
+        move_piece(self, src, dest,
                    promotion_piece=move.promotion,
                    is_castle=move.is_castle,
                    is_en_passant=move.is_en_passant)
-        self.add_move(move)
-        # after a move has been registered, reset ep calculation
-        self._ep_computed = False
-        self._check_computed = {
-            WHITE: False,
-            BLACK: False,
-        }
+
+        h = self._hash ^ SIDE_KEY
+        castling = self._castling & CASTLING_MASKS[src] & CASTLING_MASKS[dest]
+        if castling != self._castling:
+            h ^= CASTLING_KEYS[self._castling] ^ CASTLING_KEYS[castling]
+            self._castling = castling
+        if self._ep_index != -1:
+            h ^= EP_KEYS[self._ep_index]
+        if piece & TYPE_MASK == PAWN_CODE and (dest - src == 20 or src - dest == 20):
+            self._ep_index = (src + dest) // 2
+            h ^= EP_KEYS[self._ep_index]
+        else:
+            self._ep_index = -1
+        self._hash = h
+        self._turn = not self._turn
+        self._in_check = [None, None]
+
+    def make_null_move(self) -> None:
+        """Pass the turn to the other side without moving anything, for null-move pruning in the search.
+        Revert it with unmake_move"""
+        self._undo.append((EMPTY, -1, self._ep_index, self._castling,
+                           self._in_check[0], self._in_check[1], self._hash))
+        self._moves.append(None)
+        h = self._hash ^ SIDE_KEY
+        if self._ep_index != -1:
+            h ^= EP_KEYS[self._ep_index]
+            self._ep_index = -1
+        self._hash = h
+        # no piece moved, so neither king has come in or out of check
+        self._turn = not self._turn
+
+    def unmake_move(self) -> None:
+        """Revert the last move made with make_move or make_null_move"""
+        move = self._moves.pop()
+        captured, captured_index, ep_index, castling, black_check, white_check, h = self._undo.pop()
+        if move is None:
+            self._ep_index = ep_index
+            self._turn = not self._turn
+            self._hash = h
+            return
+        src = move.src
+        dest = move.dest
+        piece = self._remove_piece(dest)
+        if move.promotion:
+            piece = PAWN_CODE | (piece & COLOR_MASK)
+        self._put_piece(src, piece)
+        if captured:
+            self._put_piece(captured_index, captured)
+        if move.is_castle:
+            rook_from_index, rook_to_index = get_castle_rook_index(self, src, dest)
+            self._put_piece(rook_from_index, self._remove_piece(rook_to_index))
+
+        self._ep_index = ep_index
+        self._castling = castling
+        self._in_check = [black_check, white_check]
+        self._turn = not self._turn
+        self._hash = h
+
+    def move_piece(self, move) -> None:
+        """Convenient way to add the given move"""
+        self.make_move(move)
 
 
 def get_piece_list(board: Board, color: Color) -> Iterator[Tuple[int, PieceName]]:
@@ -151,10 +348,19 @@ def get_piece_list(board: Board, color: Color) -> Iterator[Tuple[int, PieceName]
     Return the list of pieces for this color
     :returns: (index, piece name)
     """
-    for index in range(MIN_PIECE_INDEX, MAX_PIECE_INDEX + 1):
-        piece = board._board[index]
-        if get_piece_color(piece) == color:
-            yield index, piece
+    for index, code in get_code_list(board, color):
+        yield index, CODE_TO_NAME[code]
+
+
+def get_code_list(board: Board, color: Color) -> Iterator[Tuple[int, int]]:
+    """
+    Integer version of get_piece_list
+    Only visits squares in the piece list for this color, in board order
+    :returns: (index, piece code)
+    """
+    squares = board._board
+    for index in sorted(board._pieces[color]):
+        yield index, squares[index]
 
 
 def index_to_sq(index: int) -> str:
@@ -197,15 +403,20 @@ def sq_to_index(sq: str) -> int:
 
 
 def is_valid_square(index: int) -> bool:
-    return starter_board[index] != G
+    return STARTER_CODES[index] != GUARD
 
 
 def is_empty_square(board: Board, index: int) -> bool:
-    return board._board[index] == E
+    return board._board[index] == EMPTY
 
 
 def get_color(board: Board, index: int) -> Optional[Color]:
-    return get_piece_color(board._board[index])
+    return get_code_color(board._board[index])
+
+
+def get_color_flag(board: Board, index: int) -> int:
+    """Integer version of get_color. Returns WHITE_FLAG, BLACK_FLAG or 0 for empty and guard squares"""
+    return board._board[index] & COLOR_MASK
 
 
 def slide_index(index: int, dx: int, dy: int) -> int:
@@ -217,6 +428,23 @@ def slide_index(index: int, dx: int, dy: int) -> int:
     return index + (-10 * dy) + dx
 
 
+def infer_castling_rights(squares) -> int:
+    """Castling rights for kings and rooks which are on their starting squares
+    :param squares: array of piece codes"""
+    rights = 0
+    if squares[95] == KING_CODE | WHITE_FLAG:
+        if squares[98] == ROOK_CODE | WHITE_FLAG:
+            rights |= CASTLE_WHITE_KING
+        if squares[91] == ROOK_CODE | WHITE_FLAG:
+            rights |= CASTLE_WHITE_QUEEN
+    if squares[25] == KING_CODE | BLACK_FLAG:
+        if squares[28] == ROOK_CODE | BLACK_FLAG:
+            rights |= CASTLE_BLACK_KING
+        if squares[21] == ROOK_CODE | BLACK_FLAG:
+            rights |= CASTLE_BLACK_QUEEN
+    return rights
+
+
 def get_castle_rook_index(board: Board, from_index: int, to_index: int) -> Tuple[int, int]:
     """return (from_index, to_index) for the rook"""
     if from_index < to_index:
@@ -228,42 +456,38 @@ def get_castle_rook_index(board: Board, from_index: int, to_index: int) -> Tuple
 
 
 def find_king_index(board: Board, color: Color) -> int:
-    target_piece = get_piece_of_color(KING, color)
-    for i in range(MIN_PIECE_INDEX, MAX_PIECE_INDEX + 1):
-        if board._board[i] == target_piece:
-            return i
-    raise Exception("King not found")
+    """The king square is tracked by the board, so this is O(1).
+    Raises if the board has no king of this color"""
+    index = board._kings[color]
+    if index == -1:
+        raise Exception("King not found: the board has no %s king" % ("white" if color == WHITE else "black"))
+    return index
 
 
 def move_piece_castle(board: Board, from_index: int, to_index: int) -> None:
     # this should refer to the king only
-    piece = board._board[from_index]
-    assert get_raw_piece(piece) == KING
-    board._board[from_index] = E
-    board._board[to_index] = piece
+    piece = board._remove_piece(from_index)
+    assert piece & TYPE_MASK == KING_CODE
+    board._put_piece(to_index, piece)
     # find the rook and move it
     rook_from_index, rook_to_index = get_castle_rook_index(board, from_index, to_index)
-    piece = board._board[rook_from_index]
-    board._board[rook_from_index] = E
-    board._board[rook_to_index] = piece
+    board._put_piece(rook_to_index, board._remove_piece(rook_from_index))
 
 
 def move_piece_en_passant(board: Board, from_index: int, to_index: int) -> None:
     """
     Must be called with a pawn move
     """
-    piece = board._board[from_index]
-    color = get_piece_color(piece)
-    assert get_raw_piece(piece) == PAWN
-    board._board[from_index] = E
+    piece = board._remove_piece(from_index)
+    assert piece & TYPE_MASK == PAWN_CODE
 
     # location of the target pawn
-    if color == WHITE:
+    if piece & WHITE_FLAG:
         en_passant_capture_index = slide_index(to_index, 0, -1)
     else:
         en_passant_capture_index = slide_index(to_index, 0, 1)
-    board._board[en_passant_capture_index] = E
-    board._board[to_index] = piece
+    board._remove_piece(en_passant_capture_index)
+    board._put_piece(to_index, piece)
 
 
 def move_piece(board: Board, from_index: int, to_index: int,
@@ -279,17 +503,15 @@ def move_piece(board: Board, from_index: int, to_index: int,
     elif promotion_piece:
         promotion_piece = promotion_piece.upper()
         assert promotion_piece in PIECES
-        piece = board._board[from_index]
-        color = get_piece_color(piece)
-        assert get_raw_piece(piece) == PAWN
-        assert color is not None
+        piece = board._remove_piece(from_index)
+        assert piece & TYPE_MASK == PAWN_CODE
         assert index_to_row(to_index) in [1, 8]
-        board._board[from_index] = E
-        board._board[to_index] = get_piece_of_color(promotion_piece, color)
+        board._remove_piece(to_index)
+        board._put_piece(to_index, _RAW_CODES[promotion_piece] | (piece & COLOR_MASK))
     else:
-        piece = board._board[from_index]
-        board._board[from_index] = E
-        board._board[to_index] = piece
+        piece = board._remove_piece(from_index)
+        board._remove_piece(to_index)
+        board._put_piece(to_index, piece)
 
 
 def get_piece_of_color(piece_name: PieceName, color: Color) -> PieceName:
@@ -307,25 +529,92 @@ def get_raw_piece(piece: PieceName) -> PieceName:
     return piece.upper()
 
 
+def get_code_color(code: int) -> Optional[Color]:
+    """Integer version of get_piece_color"""
+    if code & WHITE_FLAG:
+        return WHITE
+    elif code & BLACK_FLAG:
+        return BLACK
+    else:
+        return None
+
+
+def get_raw_code(code: int) -> int:
+    """Integer version of get_raw_piece: strip the color bits from the piece code"""
+    return code & TYPE_MASK
+
+
+_FEN_CASTLING = {
+    "K": CASTLE_WHITE_KING,
+    "Q": CASTLE_WHITE_QUEEN,
+    "k": CASTLE_BLACK_KING,
+    "q": CASTLE_BLACK_QUEEN,
+}
+
+
 def fen_to_board(fen: str) -> Board:
-    """Convert FEN to a row-array"""
+    """Convert FEN to a row-array.
+    The side to move, castling and en-passant fields are read if present.
+    Without a castling field, castling rights are inferred from the position"""
     flat_arr = [G]
+    fields = fen.split()
 
-    for c in fen:
+    for c in fields[0]:
         if c.isdigit():
             for i in range(int(c)):
                 flat_arr.append(E)
         elif c.isalpha():
             flat_arr.append(c)
-        elif c == " ":
-            # ignore the other info
-            break
         elif c == "/":
             flat_arr.extend([G, G])
 
     flat_arr.append(G)
     assert len(flat_arr) == 80
-    return Board(([G] * 20) + flat_arr + ([G] * 20))
+    board = Board(([G] * 20) + flat_arr + ([G] * 20))
+
+    turn = (BLACK if len(fields) > 1 and fields[1] == "b" else WHITE)
+    castling = board._castling
+    if len(fields) > 2:
+        castling = 0
+        for c in fields[2]:
+            castling |= _FEN_CASTLING.get(c, 0)
+    ep_index = -1
+    if len(fields) > 3 and fields[3] != "-":
+        ep_index = sq_to_index(fields[3])
+    board.set_state(turn, castling, ep_index)
+    _check_kings(board)
+    return board
+
+
+# the 64 playing squares, from a8 to h1
+PLAYING_SQUARES = tuple(index for index in range(BOARD_SIZE) if STARTER_CODES[index] != GUARD)
+
+
+def board_to_bytes(board: Board) -> bytes:
+    """Compact serialised form of the position, to send to other processes: one byte per playing square,
+    then the side to move, castling rights and en-passant square. The move history is not kept"""
+    squares = board._board
+    return bytes(squares[index] for index in PLAYING_SQUARES) + \
+        bytes([board._turn, board._castling, board._ep_index + 1])
+
+
+def bytes_to_board(data: bytes) -> Board:
+    """Inverse of board_to_bytes"""
+    squares = bytearray(STARTER_CODES)
+    for index, code in zip(PLAYING_SQUARES, data):
+        squares[index] = code
+    board = Board(squares)
+    board.set_state(bool(data[64]), data[65], data[66] - 1)
+    return board
+
+
+def _check_kings(board: Board) -> Board:
+    """Raise unless the board has exactly one king of each color"""
+    for color in (WHITE, BLACK):
+        count = sum(1 for _, code in get_code_list(board, color) if code & TYPE_MASK == KING_CODE)
+        if count != 1:
+            raise ValueError("Expected one %s king, found %d" % (("white" if color == WHITE else "black"), count))
+    return board
 
 
 def load_board(arr) -> Board:
@@ -339,7 +628,7 @@ def load_board(arr) -> Board:
     for row in arr:
         board.extend([G] + [(E if sq.rstrip() == "" else sq) for sq in row] + [G])
     board.extend([G] * 20)
-    return Board(board)
+    return _check_kings(Board(board))
 
 
 def dump_board(board: Board) -> List[List[str]]:
@@ -378,7 +667,7 @@ def print_board(board: Board) -> None:
     print("*" * 18)
 
 
-def is_capture(board: Board, dest_index: int, piece: PieceName) -> bool:
+def is_capture(board: Board, dest_index: int, piece: int) -> bool:
     """Return True iff the move is a capture.
-    :param piece: the piece that is moving"""
-    return get_color(board, dest_index) is not None and get_color(board, dest_index) != get_piece_color(piece)
+    :param piece: code of the piece that is moving"""
+    return bool(board._board[dest_index] & (COLOR_MASK ^ (piece & COLOR_MASK)))
@@ -1,7 +1,8 @@
 from typing import Optional
 
-from .board import (PAWN, Board, PieceName, get_raw_piece, index_to_sq,
-                    move_piece)
+from .board import (CODE_TO_NAME, COLOR_MASK, KING_CODE, NAME_TO_CODE, PAWN,
+                    PAWN_CODE, TYPE_MASK, Board, PieceName, get_raw_piece,
+                    index_to_sq, move_piece)
 
 
 class Move(object):
@@ -40,6 +41,23 @@ class Move(object):
             )
 
 
+def encode_move(move: Move) -> int:
+    """Pack the move into a small non-zero integer: source and destination squares and promotion piece type"""
+    promotion = (NAME_TO_CODE[move.promotion] & TYPE_MASK if move.promotion else 0)
+    return move.src | (move.dest << 7) | (promotion << 14)
+
+
+def decode_move(board: Board, packed: int) -> Move:
+    """Inverse of encode_move, for the given board. The move is not checked for legality"""
+    src = packed & 127
+    dest = (packed >> 7) & 127
+    promotion = packed >> 14
+    move = move_from_indices(board, src, dest)
+    if promotion:
+        move.promotion = CODE_TO_NAME[promotion | (board._board[src] & COLOR_MASK)]
+    return move
+
+
 def gen_successor(board_init: Board, src: int, dest: int) -> Board:
     """Called by core-internal functions
     Don't bother updating other data structures in board_init
@@ -51,10 +69,19 @@ def gen_successor(board_init: Board, src: int, dest: int) -> Board:
 
 
 def gen_successor_from_move(board_init: Board, move: Move) -> Board:
-    board = gen_successor(board_init, move.src, move.dest)
-    board._moves = board_init._moves
-    board.add_move(move)
-    if move.promotion:
-        # change the piece at dest into the correct piece
-        board._board[move.dest] = move.promotion
+    """Copy the board and apply the move to the copy.
+    Search code should prefer Board.make_move / Board.unmake_move, which do not allocate a new board"""
+    board = board_init.copy()
+    board.make_move(move)
     return board
+
+
+def move_from_indices(board: Board, src: int, dest: int) -> Move:
+    """Create the move of the piece on src to dest, filling in capture, en-passant and castling metadata.
+    Promotions are left to the caller"""
+    piece = board._board[src]
+    raw = piece & TYPE_MASK
+    return Move(CODE_TO_NAME[piece], src, dest,
+                is_capture=bool(board._board[dest] & (COLOR_MASK ^ (piece & COLOR_MASK))),
+                is_castle=(raw == KING_CODE and (dest - src == 2 or src - dest == 2)),
+                is_en_passant=(raw == PAWN_CODE and dest == board._ep_index))
@@ -0,0 +1,66 @@
+"""
+Per-square move tables for the 120-square mailbox, built once at import time.
+Every target in these tables is on the board, so move generation never has to look at guard regions.
+"""
+from typing import Tuple
+
+from .board import BOARD_SIZE, is_valid_square
+
+# mailbox offsets. Moving up one row (towards row 8) is -10
+# the order of each tuple is the order in which moves are generated
+KNIGHT_OFFSETS = (-19, 21, -21, 19, -8, 12, -12, 8)
+KING_OFFSETS = (11, 1, -9, 10, -10, 9, -1, -11)
+ROOK_DIRECTIONS = (1, -1, -10, 10)
+BISHOP_DIRECTIONS = (-9, -11, 11, 9)
+# rook directions first, then bishop directions
+DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+Squares = Tuple[int, ...]
+
+
+def _targets(index: int, offsets: Squares) -> Squares:
+    if not is_valid_square(index):
+        return ()
+    return tuple(index + offset for offset in offsets if is_valid_square(index + offset))
+
+
+def _ray(index: int, step: int) -> Squares:
+    """All squares from index (exclusive) to the edge of the board in the direction of step"""
+    if not is_valid_square(index):
+        return ()
+    ray = []
+    index += step
+    while is_valid_square(index):
+        ray.append(index)
+        index += step
+    return tuple(ray)
+
+
+KNIGHT_TARGETS = tuple(_targets(index, KNIGHT_OFFSETS) for index in range(BOARD_SIZE))
+KING_TARGETS = tuple(_targets(index, KING_OFFSETS) for index in range(BOARD_SIZE))
+
+# one ray per entry in DIRECTIONS, possibly empty
+DIRECTION_RAYS = tuple(
+    tuple(_ray(index, step) for step in DIRECTIONS)
+    for index in range(BOARD_SIZE)
+)
+# only the non-empty rays, for move generation
+ROOK_RAYS = tuple(
+    tuple(ray for ray in rays[:4] if ray) for rays in DIRECTION_RAYS
+)
+BISHOP_RAYS = tuple(
+    tuple(ray for ray in rays[4:] if ray) for rays in DIRECTION_RAYS
+)
+QUEEN_RAYS = tuple(rook + bishop for rook, bishop in zip(ROOK_RAYS, BISHOP_RAYS))
+
+# squares attacked by a pawn standing on each square, indexed by color (BLACK, WHITE) then square
+PAWN_ATTACKS = (
+    tuple(_targets(index, (11, 9)) for index in range(BOARD_SIZE)),
+    tuple(_targets(index, (-9, -11)) for index in range(BOARD_SIZE)),
+)
+
+# for each square, the index into DIRECTION_RAYS of the ray through every other square on the same line
+RAY_DIRECTION = tuple(
+    dict((target, direction) for direction, ray in enumerate(rays) for target in ray)
+    for rays in DIRECTION_RAYS
+)
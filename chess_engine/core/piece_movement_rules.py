@@ -1,175 +1,200 @@
-import itertools
-from typing import Iterator, List, Any
-
-from .board import (BISHOP, BLACK, KING, KNIGHT, PAWN, QUEEN, ROOK, WHITE,
-                    Board, Color, E, PieceName, find_king_index, get_color,
-                    get_piece_color, get_piece_list, get_raw_piece,
-                    index_to_row, is_capture, is_empty_square,
-                    is_valid_square, slide_index, sq_to_index)
-from .move import gen_successor
+from typing import Dict, FrozenSet, Iterator, List, Tuple
+
+from .board import (BISHOP_CODE, BLACK, BLACK_FLAG, CASTLE_BLACK_KING,
+                    CASTLE_BLACK_QUEEN, CASTLE_WHITE_KING, CASTLE_WHITE_QUEEN,
+                    COLOR_FLAGS, COLOR_MASK, EMPTY, KING_CODE, KNIGHT_CODE,
+                    NAME_TO_CODE, PAWN_CODE, QUEEN_CODE, ROOK_CODE, TYPE_MASK,
+                    WHITE, WHITE_FLAG, Board, Color, PieceName,
+                    find_king_index, get_code_list, get_color, index_to_row,
+                    is_empty_square, is_valid_square, slide_index, sq_to_index)
+from .move import Move, move_from_indices
+from .move_tables import (BISHOP_RAYS, DIRECTION_RAYS, KING_TARGETS,
+                          KNIGHT_TARGETS, PAWN_ATTACKS, QUEEN_RAYS,
+                          RAY_DIRECTION, ROOK_RAYS)
 from .utils import get_opposite_color
 
-
-def is_valid_and_empty(board: Board, index: int) -> bool:
-    return is_valid_square(index) and is_empty_square(board, index)
-
-
-def is_empty_or_capture(board: Board, index: int, piece: PieceName) -> bool:
-    return is_valid_square(index) and (
-        is_empty_square(board, index) or is_capture(board, index, piece))
+# which moves gen_legal_squares generates. Pawn pushes onto the last row count as captures,
+# so promotions are never quiet
+CAPTURES = 1
+QUIETS = 2
+ALL_MOVES = CAPTURES | QUIETS
 
 
 def is_valid_en_passant(board: Board, from_index: int, to_index: int) -> bool:
     """Does not check whether the person will be in check after the move"""
     return board.is_en_passant_possible() and board.get_ep_capture_index() == to_index
 
-def is_valid_capture(board: Board, to_index: int, piece: PieceName) -> bool:
-    """
-    This method does not handle en-passant
-    That is handled by its own method
-    """
-    return is_valid_square(to_index) and is_capture(board, to_index, piece)
 
-
-def slide_and_check(board: Board, index: int, piece_color: Color, dy: int, dx: int) -> Iterator[int]:
-    """Slide the given piece in the direction (dx, dy) from index.
-    Return a generator over all the squares that the piece could visit, including captures, in that direction
-    Extend squares array with valid squares.
-    TODO, in the future, write this to be easily parallelisable"""
-    while True:
-        index = slide_index(index, dx, dy)
-
-        if not is_valid_square(index):
-            return
-        if is_empty_square(board, index):
-            yield index
-        else:
-            # logging.debug("square occupied by %s" % board[index])
-            # logging.debug("attacking piece is %s" % piece)
-            if piece_color != get_color(board, index):
-                # this is a capture
-                yield index
-            return
+def slide_rays(board: Board, index: int, rays) -> Iterator[int]:
+    """Walk each precomputed ray from index until the first occupied square.
+    Return a generator over all the squares that the piece could visit, including captures"""
+    squares = board._board
+    enemy = COLOR_MASK ^ (squares[index] & COLOR_MASK)
+    for ray in rays:
+        for dest in ray:
+            code = squares[dest]
+            if code == EMPTY:
+                yield dest
+            else:
+                if code & enemy:
+                    # this is a capture
+                    yield dest
+                break
 
 
 def get_rook_valid_squares(board: Board, index: int) -> Iterator[int]:
-    piece = board._board[index]
-    color: Any = get_piece_color(piece)
-    return itertools.chain(
-        slide_and_check(board, index, color, 0, 1),
-        slide_and_check(board, index, color, 0, -1),
-        slide_and_check(board, index, color, 1, 0),
-        slide_and_check(board, index, color, -1, 0)
-    )
+    return slide_rays(board, index, ROOK_RAYS[index])
 
 
 def get_bishop_valid_squares(board: Board, index: int) -> Iterator[int]:
-    piece = board._board[index]
-    color: Any = get_piece_color(piece)
-    return itertools.chain(
-        slide_and_check(board, index, color, 1, 1),
-        slide_and_check(board, index, color, 1, -1),
-        slide_and_check(board, index, color, -1, 1),
-        slide_and_check(board, index, color, -1, -1)
-    )
+    return slide_rays(board, index, BISHOP_RAYS[index])
 
 
 def get_queen_valid_squares(board: Board, index: int) -> Iterator[int]:
-    return itertools.chain(
-        get_rook_valid_squares(board, index),
-        get_bishop_valid_squares(board, index)
-    )
+    return slide_rays(board, index, QUEEN_RAYS[index])
 
 
 def get_king_valid_squares(board: Board, index: int) -> Iterator[int]:
-    """This is easily parallelisable. """
-    piece = board._board[index]
-    squares = [
-        slide_index(index, 1, -1),
-        slide_index(index, 1, 0),
-        slide_index(index, 1, 1),
-        slide_index(index, 0, -1),
-        slide_index(index, 0, 1),
-        slide_index(index, -1, -1),
-        slide_index(index, -1, 0),
-        slide_index(index, -1, 1),
-    ]
-    # TODO, this does not check whether capture is possible by the king
-    # this will be implemented later
-    return (
-        index for index in squares
-        if is_empty_or_capture(board, index, piece)
-    )
+    """Does not check whether the destination is attacked, or castling"""
+    squares = board._board
+    own = squares[index] & COLOR_MASK
+    return (dest for dest in KING_TARGETS[index] if not squares[dest] & own)
 
 
 def get_pawn_valid_squares(board: Board, from_index: int) -> Iterator[int]:
-    piece = board._board[from_index]
-    dy = (1 if get_piece_color(piece) == WHITE else -1)
-    row = index_to_row(from_index)
+    squares = board._board
+    piece = squares[from_index]
+    color = bool(piece & WHITE_FLAG)
+    step = (-10 if color == WHITE else 10)
 
     # regular moves
-    one_up_move = slide_index(from_index, 0, dy)
-    if not is_valid_square(one_up_move):
-        # if moving one up takes you off the board, then there's really no point checking the other squares
-        return
-
-    if is_empty_square(board, one_up_move):
+    one_up_move = from_index + step
+    if squares[one_up_move] == EMPTY:
         yield one_up_move
 
-        color = get_piece_color(piece)
+        row = index_to_row(from_index)
         if (row == 7 and color == BLACK) or (row == 2 and color == WHITE):
-            two_up_move = slide_index(from_index, 0, 2 * dy)
+            two_up_move = one_up_move + step
             # always on the board, based on this check
-            if is_empty_square(board, two_up_move):
+            if squares[two_up_move] == EMPTY:
                 yield two_up_move
 
-    is_ep_possible = board.is_en_passant_possible()
-
     # capture moves
-    l2 = [slide_index(from_index, 1, dy), slide_index(from_index, -1, dy)]
-    for to_index in l2:
-        if is_ep_possible and board.get_ep_capture_index() == to_index:
-            yield to_index
-        elif is_valid_capture(board, to_index, piece):
+    enemy = COLOR_FLAGS[not color]
+    ep_index = board._ep_index
+    for to_index in PAWN_ATTACKS[color][from_index]:
+        if squares[to_index] & enemy or to_index == ep_index:
             yield to_index
 
 
 def get_knight_valid_squares(board: Board, index: int) -> Iterator[int]:
-    piece = board._board[index]
-    squares = [
-        slide_index(index, 1, 2),
-        slide_index(index, 1, -2),
-        slide_index(index, -1, 2),
-        slide_index(index, -1, -2),
-        slide_index(index, 2, 1),
-        slide_index(index, 2, -1),
-        slide_index(index, -2, 1),
-        slide_index(index, -2, -1),
-    ]
-    return (index for index in squares
-            if is_empty_or_capture(board, index, piece))
+    squares = board._board
+    own = squares[index] & COLOR_MASK
+    return (dest for dest in KNIGHT_TARGETS[index] if not squares[dest] & own)
 
 
 def get_piece_valid_squares(board: Board, from_index: int) -> Iterator[int]:
-    piece = get_raw_piece(board._board[from_index])
-    if piece == KNIGHT:
+    piece = board._board[from_index] & TYPE_MASK
+    if piece == KNIGHT_CODE:
         return get_knight_valid_squares(board, from_index)
-    elif piece == ROOK:
+    elif piece == ROOK_CODE:
         return get_rook_valid_squares(board, from_index)
-    elif piece == QUEEN:
+    elif piece == QUEEN_CODE:
         return get_queen_valid_squares(board, from_index)
-    elif piece == KING:
+    elif piece == KING_CODE:
         return get_king_valid_squares(board, from_index)
-    elif piece == PAWN:
+    elif piece == PAWN_CODE:
         return get_pawn_valid_squares(board, from_index)
-    elif piece == BISHOP:
+    elif piece == BISHOP_CODE:
         return get_bishop_valid_squares(board, from_index)
     else:
-        raise Exception("bad piece at index %d: %s" % (from_index, piece))
+        raise Exception("bad piece at index %d: %s" % (from_index, board[from_index]))
+
+
+def get_piece_capture_squares(board: Board, from_index: int) -> Iterator[int]:
+    """Destinations of the piece which capture an enemy piece, including en-passant, and pawn pushes onto the last row.
+    Like get_piece_valid_squares, the mover may be left in check"""
+    squares = board._board
+    piece = squares[from_index]
+    raw = piece & TYPE_MASK
+    enemy = COLOR_MASK ^ (piece & COLOR_MASK)
+    if raw == PAWN_CODE:
+        color = bool(piece & WHITE_FLAG)
+        ep_index = board._ep_index
+        for dest in PAWN_ATTACKS[color][from_index]:
+            if squares[dest] & enemy or dest == ep_index:
+                yield dest
+        push = from_index + (-10 if color == WHITE else 10)
+        if squares[push] == EMPTY and index_to_row(push) in (1, 8):
+            yield push
+    elif raw == KNIGHT_CODE or raw == KING_CODE:
+        for dest in (KNIGHT_TARGETS if raw == KNIGHT_CODE else KING_TARGETS)[from_index]:
+            if squares[dest] & enemy:
+                yield dest
+    else:
+        rays = (ROOK_RAYS if raw == ROOK_CODE else BISHOP_RAYS if raw == BISHOP_CODE else QUEEN_RAYS)
+        for ray in rays[from_index]:
+            for dest in ray:
+                code = squares[dest]
+                if code != EMPTY:
+                    if code & enemy:
+                        yield dest
+                    break
+
+
+def get_piece_quiet_squares(board: Board, from_index: int) -> Iterator[int]:
+    """Destinations of the piece which are not returned by get_piece_capture_squares"""
+    squares = board._board
+    piece = squares[from_index]
+    raw = piece & TYPE_MASK
+    if raw == PAWN_CODE:
+        color = bool(piece & WHITE_FLAG)
+        step = (-10 if color == WHITE else 10)
+        one_up_move = from_index + step
+        row = index_to_row(one_up_move)
+        if squares[one_up_move] == EMPTY and row != 1 and row != 8:
+            yield one_up_move
+            if (row == 6 and color == BLACK) or (row == 3 and color == WHITE):
+                two_up_move = one_up_move + step
+                if squares[two_up_move] == EMPTY:
+                    yield two_up_move
+    elif raw == KNIGHT_CODE or raw == KING_CODE:
+        for dest in (KNIGHT_TARGETS if raw == KNIGHT_CODE else KING_TARGETS)[from_index]:
+            if squares[dest] == EMPTY:
+                yield dest
+    else:
+        rays = (ROOK_RAYS if raw == ROOK_CODE else BISHOP_RAYS if raw == BISHOP_CODE else QUEEN_RAYS)
+        for ray in rays[from_index]:
+            for dest in ray:
+                if squares[dest] != EMPTY:
+                    break
+                yield dest
+
+
+# (castling right, king square, king destination, squares which must be empty,
+#  squares the king passes through or lands on, rook square), indexed by color
+_CASTLES = tuple(
+    tuple((right, sq_to_index("e" + row), sq_to_index(dest + row),
+           tuple(sq_to_index(sq + row) for sq in empty),
+           tuple(sq_to_index(sq + row) for sq in passes),
+           sq_to_index(rook + row))
+          for right, dest, empty, passes, rook in sides)
+    for row, sides in [
+        ("8", [(CASTLE_BLACK_KING, "g", "fg", "fg", "h"), (CASTLE_BLACK_QUEEN, "c", "dcb", "dc", "a")]),
+        ("1", [(CASTLE_WHITE_KING, "g", "fg", "fg", "h"), (CASTLE_WHITE_QUEEN, "c", "dcb", "dc", "a")]),
+    ]
+)
+
+
+_PIECE_SQUARES_BY_STAGE = {
+    CAPTURES: get_piece_capture_squares,
+    QUIETS: get_piece_quiet_squares,
+    ALL_MOVES: get_piece_valid_squares,
+}
 
 
 def is_castle_move(board: Board, from_index: int, to_index: int) -> bool:
-    if (get_raw_piece(board._board[from_index]) != KING):
+    if board._board[from_index] & TYPE_MASK != KING_CODE:
         return False
     potential_castle_squares = [
         slide_index(from_index, -2, 0),
@@ -180,9 +205,9 @@ def is_castle_move(board: Board, from_index: int, to_index: int) -> bool:
 
 def can_castle(board: Board, from_index: int, to_index: int) -> bool:
     """
-    Castling is quite complicated and I have not implemented all the rules
-    1. The king must have never moved. Using the current arguments, there is no way to verify this
-    2. The rook must have never moved. Using the current arguments, there is no way to verify this
+    Castling is quite complicated
+    1. The king must have never moved. This is tracked by the castling rights on the board
+    2. The rook must have never moved. This is tracked by the castling rights on the board
 
     Note that the rook may pass through attacking squares. That's fine.
     Additionally the rook can move if it is under attack.
@@ -201,8 +226,12 @@ def can_castle(board: Board, from_index: int, to_index: int) -> bool:
     # includes the final position
     king_passes_squares = []  # type: List[int]
     rook_square = -1
+    color = get_color(board, from_index)
+    assert color is not None
     if from_index < to_index:
         # castling right
+        if not board.can_castle(CASTLE_WHITE_KING if color == WHITE else CASTLE_BLACK_KING):
+            return False
         check_squares = [
             slide_index(from_index, 1, 0),
             slide_index(from_index, 2, 0),
@@ -211,6 +240,8 @@ def can_castle(board: Board, from_index: int, to_index: int) -> bool:
         king_passes_squares = check_squares[:]
     else:
         # castling left
+        if not board.can_castle(CASTLE_WHITE_QUEEN if color == WHITE else CASTLE_BLACK_QUEEN):
+            return False
         check_squares = [
             slide_index(from_index, -1, 0),
             slide_index(from_index, -2, 0),
@@ -222,10 +253,8 @@ def can_castle(board: Board, from_index: int, to_index: int) -> bool:
     for square in check_squares:
         if not is_empty_square(board, square):
             return False
-    if get_raw_piece(board._board[rook_square]) != ROOK:
+    if board._board[rook_square] & TYPE_MASK != ROOK_CODE:
         return False
-    color = get_color(board, from_index)
-    assert color is not None
 
     if get_color(board, rook_square) != color:
         return False
@@ -240,12 +269,9 @@ def can_castle(board: Board, from_index: int, to_index: int) -> bool:
     if is_in_check(board, color):
         return False
 
+    opp_color = get_opposite_color(color)
     for idx in king_passes_squares:
-        b2 = Board(board._board)
-        piece = b2._board[from_index]
-        b2._board[from_index] = E
-        b2._board[idx] = piece
-        if is_in_check(b2, color):
+        if is_square_attacked(board, idx, opp_color):
             return False
     return True
 
@@ -270,39 +296,288 @@ def is_legal_move(board: Board, from_index: int, to_index: int) -> bool:
         if to_index not in get_piece_valid_squares(board, from_index):
             return False
 
-    return not is_in_check(gen_successor(board, from_index, to_index), color)
+    return _is_legal_after(board, move_from_indices(board, from_index, to_index), color)
+
+
+def _is_legal_after(board: Board, move, color: Color) -> bool:
+    """Make the move in place, test whether the mover is in check, then revert it"""
+    board.make_move(move)
+    legal = not is_in_check(board, color)
+    board.unmake_move()
+    return legal
+
+
+def is_square_attacked(board: Board, index: int, by_color: Color) -> bool:
+    """Return True iff any piece of by_color attacks the square at index.
+    Works backwards from the target square: knight and king offsets, pawn diagonals,
+    and the first piece on each sliding ray"""
+    squares = board._board
+    flag = COLOR_FLAGS[by_color]
+
+    knight = KNIGHT_CODE | flag
+    for sq in KNIGHT_TARGETS[index]:
+        if squares[sq] == knight:
+            return True
+
+    # a pawn attacks the target if the target attacks it as a pawn of the other color
+    pawn = PAWN_CODE | flag
+    for sq in PAWN_ATTACKS[not by_color][index]:
+        if squares[sq] == pawn:
+            return True
+
+    king = KING_CODE | flag
+    for sq in KING_TARGETS[index]:
+        if squares[sq] == king:
+            return True
+
+    queen = QUEEN_CODE | flag
+    rook = ROOK_CODE | flag
+    for ray in ROOK_RAYS[index]:
+        for sq in ray:
+            code = squares[sq]
+            if code:
+                if code == rook or code == queen:
+                    return True
+                break
+
+    bishop = BISHOP_CODE | flag
+    for ray in BISHOP_RAYS[index]:
+        for sq in ray:
+            code = squares[sq]
+            if code:
+                if code == bishop or code == queen:
+                    return True
+                break
+    return False
 
 
 def is_in_check(board: Board, color: Color) -> bool:
     """
-    Note that this function is expensive to compute
-    Avoid calling it too many times
+    The result is cached on the board until the next move
     """
-    if board._check_computed[color]:
-        return board.get_check(color)
-    # find the king
-    king_pos = find_king_index(board, color)
-
+    cached = board._in_check[color]
+    if cached is not None:
+        return cached
+    in_check = is_square_attacked(board, find_king_index(board, color), not color)
+    board.set_check(color, in_check)
+    return in_check
+
+
+def get_pins_and_checkers(board: Board, color: Color) -> Tuple[Dict[int, FrozenSet[int]], List[int], FrozenSet[int]]:
+    """Look outwards from the king of the given color once, and find
+    - pinned pieces, mapped to the squares they may move to without leaving the pin line
+    - the squares of pieces giving check
+    - the squares which stop a single check: capturing the checker, or blocking a sliding checker
+    :returns: (pins, checkers, evasion squares)"""
+    squares = board._board
+    king = find_king_index(board, color)
+    own = COLOR_FLAGS[color]
+    enemy = COLOR_FLAGS[not color]
+    pins = {}  # type: Dict[int, FrozenSet[int]]
+    checkers = []  # type: List[int]
+    evasions = frozenset()  # type: FrozenSet[int]
+
+    for direction, ray in enumerate(DIRECTION_RAYS[king]):
+        slider = (ROOK_CODE if direction < 4 else BISHOP_CODE) | enemy
+        queen = QUEEN_CODE | enemy
+        blocker = -1
+        for i, sq in enumerate(ray):
+            code = squares[sq]
+            if code == EMPTY:
+                continue
+            if code & own:
+                if blocker != -1:
+                    # two of our own pieces on the ray, nothing is pinned
+                    break
+                blocker = sq
+            else:
+                if code == slider or code == queen:
+                    line = frozenset(ray[:i + 1])
+                    if blocker == -1:
+                        checkers.append(sq)
+                        evasions = line
+                    else:
+                        pins[blocker] = line
+                break
+
+    knight = KNIGHT_CODE | enemy
+    for sq in KNIGHT_TARGETS[king]:
+        if squares[sq] == knight:
+            checkers.append(sq)
+            evasions = frozenset([sq])
+    pawn = PAWN_CODE | enemy
+    for sq in PAWN_ATTACKS[color][king]:
+        if squares[sq] == pawn:
+            checkers.append(sq)
+            evasions = frozenset([sq])
+
+    return pins, checkers, evasions
+
+
+def gen_castle_squares(board: Board, color: Color) -> Iterator[int]:
+    """Destinations of the king of the given color for each legal castle.
+    The caller has already checked that the king is not in check"""
+    squares = board._board
+    rook = ROOK_CODE | COLOR_FLAGS[color]
     opp_color = get_opposite_color(color)
-    # get everything for that color
-    for index, _ in get_piece_list(board, opp_color):
-        for sq in get_piece_valid_squares(board, index):
-            if sq == king_pos:
-                board.set_check(color, True)
-                return True
-    board.set_check(color, False)
+    castling = board._castling
+    for right, king, dest, empty, passes, rook_square in _CASTLES[color]:
+        if not castling & right or squares[king] & TYPE_MASK != KING_CODE or squares[rook_square] != rook:
+            continue
+        if any(squares[sq] != EMPTY for sq in empty):
+            continue
+        if any(is_square_attacked(board, sq, opp_color) for sq in passes):
+            continue
+        yield dest
+
+
+def gen_legal_squares(board: Board, color: Color, stage: int = ALL_MOVES) -> Iterator[Tuple[int, int]]:
+    """Generate (src, dest) for every legal move by the given color. Castling is a king move of two squares.
+    Pins and checks are computed once for the position, so only king moves and
+    en-passant captures need to be verified against the resulting position.
+    Promotions are left to the caller
+    :param stage: CAPTURES, QUIETS or ALL_MOVES"""
+    squares = board._board
+    king = find_king_index(board, color)
+    pins, checkers, evasions = get_pins_and_checkers(board, color)
+    board.set_check(color, bool(checkers))
+    piece_squares = _PIECE_SQUARES_BY_STAGE[stage]
+
+    # the king must not be on the board while testing its destinations, otherwise it blocks sliding attacks
+    opp_color = get_opposite_color(color)
+    king_code = squares[king]
+    king_dests = list(piece_squares(board, king))
+    squares[king] = EMPTY
+    king_dests = [dest for dest in king_dests if not is_square_attacked(board, dest, opp_color)]
+    squares[king] = king_code
+    if stage & QUIETS and not checkers:
+        king_dests.extend(gen_castle_squares(board, color))
+
+    if len(checkers) > 1:
+        # double check, only the king can move
+        for dest in king_dests:
+            yield king, dest
+        return
+
+    ep_index = board._ep_index
+    for src, code in get_code_list(board, color):
+        if src == king:
+            for dest in king_dests:
+                yield king, dest
+            continue
+        pin_line = pins.get(src)
+        is_pawn = code & TYPE_MASK == PAWN_CODE
+        for dest in piece_squares(board, src):
+            if is_pawn and dest == ep_index:
+                # en-passant removes two pieces from a row, so it can expose the king in ways pins do not see
+                if _is_legal_after(board, move_from_indices(board, src, dest), color):
+                    yield src, dest
+                continue
+            if checkers and dest not in evasions:
+                continue
+            if pin_line is not None and dest not in pin_line:
+                continue
+            yield src, dest
+
+
+def gen_legal_moves(board: Board, color: Color, stage: int = ALL_MOVES) -> Iterator[Move]:
+    """Same as gen_legal_squares, as moves. Each promotion piece is a separate move"""
+    squares = board._board
+    for src, dest in gen_legal_squares(board, color, stage):
+        move = move_from_indices(board, src, dest)
+        promotions = _get_promotions(squares[src], src, dest)
+        if promotions != []:
+            for promotion in promotions:
+                yield Move(move.piece, src, dest, promotion=promotion, is_capture=move.is_capture)
+        else:
+            yield move
+
+
+def gives_direct_check(board: Board, move: Move, king: int) -> bool:
+    """Whether the moved (or promoted) piece attacks the square king after the move.
+    Discovered checks are not detected"""
+    squares = board._board
+    if move.promotion:
+        piece = NAME_TO_CODE[move.promotion]
+    else:
+        piece = squares[move.src]
+    raw = piece & TYPE_MASK
+    dest = move.dest
+    if raw == KNIGHT_CODE:
+        return dest in KNIGHT_TARGETS[king]
+    elif raw == PAWN_CODE:
+        return king in PAWN_ATTACKS[(piece & WHITE_FLAG) != 0][dest]
+    elif raw == KING_CODE:
+        return False
+    direction = RAY_DIRECTION[king].get(dest)
+    if direction is None:
+        return False
+    # DIRECTION_RAYS lists the rook directions first
+    if (raw == ROOK_CODE and direction >= 4) or (raw == BISHOP_CODE and direction < 4):
+        return False
+    src = move.src
+    for index in DIRECTION_RAYS[king][direction]:
+        if index == dest:
+            return True
+        if squares[index] and index != src:
+            return False
     return False
 
 
+def get_discovered_check_lines(board: Board, color: Color) -> Dict[int, int]:
+    """Pieces of the given color which stand between the enemy king and a slider of the same color,
+    mapped to the direction of that line from the king (an index into DIRECTION_RAYS).
+    Moving such a piece off the line gives a discovered check"""
+    squares = board._board
+    king = find_king_index(board, get_opposite_color(color))
+    own = COLOR_FLAGS[color]
+    queen = QUEEN_CODE | own
+    lines = {}  # type: Dict[int, int]
+    for direction, ray in enumerate(DIRECTION_RAYS[king]):
+        slider = (ROOK_CODE if direction < 4 else BISHOP_CODE) | own
+        blocker = -1
+        for sq in ray:
+            code = squares[sq]
+            if code == EMPTY:
+                continue
+            if blocker == -1 and code & own:
+                blocker = sq
+                continue
+            if blocker != -1 and (code == slider or code == queen):
+                lines[blocker] = direction
+            break
+    return lines
+
+
+def gives_check(board: Board, move: Move, king: int, discoverers: Dict[int, int]) -> bool:
+    """Whether the move checks the enemy king on the square king, directly or by discovery.
+    :param discoverers: from get_discovered_check_lines for the moving side"""
+    if move.is_castle or move.is_en_passant:
+        # the rook gives the check, or two pawns leave the row: rare enough to just make the move
+        color = get_color(board, move.src)
+        board.make_move(move)
+        check = is_in_check(board, get_opposite_color(color))
+        board.unmake_move()
+        return check
+    if gives_direct_check(board, move, king):
+        return True
+    direction = discoverers.get(move.src)
+    return direction is not None and RAY_DIRECTION[king].get(move.dest) != direction
+
+
+def gen_checking_moves(board: Board, color: Color) -> Iterator[Move]:
+    """Same as gen_legal_moves, only the moves which give check.
+    Checks are found from the enemy king square and the lines through it, without making the moves"""
+    king = find_king_index(board, get_opposite_color(color))
+    discoverers = get_discovered_check_lines(board, color)
+    for move in gen_legal_moves(board, color):
+        if gives_check(board, move, king, discoverers):
+            yield move
+
+
 def _has_no_legal_moves(board: Board, color: Color) -> bool:
-    """
-    NOTE: this method is slow
-    """
-    for src_index, _ in get_piece_list(board, color):
-        for dest_index in get_piece_valid_squares(board, src_index):
-            next_board = gen_successor(board, src_index, dest_index)
-            if not is_in_check(next_board, color):
-                return False
+    for _ in gen_legal_squares(board, color):
+        return False
     return True
 
 
@@ -326,14 +601,15 @@ def get_promotions(board: Board, src: int, dest: int) -> List[PieceName]:
         return _get_promotions(board._board[src], src, dest)
 
 
-def _get_promotions(piece: PieceName, src: int, dest: int) -> List[PieceName]:
-    """Does not check if the move is valid."""
-    if get_raw_piece(piece) != PAWN:
+def _get_promotions(piece: int, src: int, dest: int) -> List[PieceName]:
+    """Does not check if the move is valid.
+    :param piece: code of the moving piece"""
+    if piece & TYPE_MASK != PAWN_CODE:
         return []
 
-    if get_piece_color(piece) == WHITE and index_to_row(dest) == 8:
+    if piece & WHITE_FLAG and index_to_row(dest) == 8:
         return ["Q", "B", "R", "N"]
-    elif get_piece_color(piece) == BLACK and index_to_row(dest) == 1:
+    elif piece & BLACK_FLAG and index_to_row(dest) == 1:
         return ["q", "b", "r", "n"]
     else:
         return []
@@ -0,0 +1,149 @@
+"""
+Material and piece-square tables, for the evaluation terms which the board keeps as running totals.
+Every piece has a middlegame and an endgame score. The board sums both over all pieces (white positive,
+black negative), together with a game phase computed from the non-pawn material left, and the evaluation
+blends the two scores by phase.
+
+Like zobrist.py, this module does not import the board module, so that the board can import the tables.
+"""
+from typing import Tuple
+
+# see board.py
+_NUM_CODES = 32
+_BOARD_SIZE = 120
+_TYPE_MASK = 7
+_WHITE_FLAG = 8
+_COLOR_MASK = 24
+_FIRST_SQUARE = 21
+
+# material in centipawns, indexed by the type bits of the piece code (pawn, knight, bishop, rook, queen, king)
+MG_MATERIAL = (0, 100, 320, 330, 500, 900, 0, 0)
+EG_MATERIAL = (0, 120, 300, 320, 520, 900, 0, 0)
+
+# contribution of each piece type to the game phase. The phase is MAX_PHASE with all the pieces on the board
+# and 0 when only kings and pawns are left
+PHASE_BY_TYPE = (0, 0, 1, 1, 2, 4, 0, 0)
+MAX_PHASE = 24
+
+# piece-square tables from white's point of view, listed from a8 to h8, then a7 to h7, ..., a1 to h1
+_PAWN_MG = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+)
+_PAWN_EG = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    80, 80, 80, 80, 80, 80, 80, 80,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    30, 30, 30, 30, 30, 30, 30, 30,
+    20, 20, 20, 20, 20, 20, 20, 20,
+    10, 10, 10, 10, 10, 10, 10, 10,
+    0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0,
+)
+_KNIGHT = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+)
+_BISHOP = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+)
+_ROOK = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    0, 0, 0, 5, 5, 0, 0, 0,
+)
+_QUEEN = (
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    0, 0, 5, 5, 5, 5, 0, -5,
+    -10, 5, 5, 5, 5, 5, 0, -10,
+    -10, 0, 5, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20,
+)
+_KING_MG = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20,
+)
+_KING_EG = (
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+)
+_EMPTY = (0,) * 64
+
+# indexed by the type bits of the piece code
+_MG_TABLES = (_EMPTY, _PAWN_MG, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING_MG, _EMPTY)
+_EG_TABLES = (_EMPTY, _PAWN_EG, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING_EG, _EMPTY)
+
+
+def _square_scores(code: int, material: Tuple[int, ...], tables: Tuple[Tuple[int, ...], ...]) -> Tuple[int, ...]:
+    """Score of the piece on each of the 120 squares, negative for black pieces"""
+    if not code & _COLOR_MASK:
+        return (0,) * _BOARD_SIZE
+    raw = code & _TYPE_MASK
+    scores = [0] * _BOARD_SIZE
+    for row in range(8):
+        for col in range(8):
+            index = _FIRST_SQUARE + row * 10 + col
+            if code & _WHITE_FLAG:
+                scores[index] = material[raw] + tables[raw][row * 8 + col]
+            else:
+                # black tables are mirrored top to bottom
+                scores[index] = -1 * (material[raw] + tables[raw][(7 - row) * 8 + col])
+    return tuple(scores)
+
+
+# indexed by piece code, then square
+MG_SCORES = tuple(_square_scores(code, MG_MATERIAL, _MG_TABLES) for code in range(_NUM_CODES))
+EG_SCORES = tuple(_square_scores(code, EG_MATERIAL, _EG_TABLES) for code in range(_NUM_CODES))
+# indexed by piece code
+PHASES = tuple((PHASE_BY_TYPE[code & _TYPE_MASK] if code & _COLOR_MASK else 0) for code in range(_NUM_CODES))
+
+
+def compute_eval(squares) -> Tuple[int, int, int]:
+    """Compute (middlegame score, endgame score, phase) for the piece codes from scratch"""
+    mg = 0
+    eg = 0
+    phase = 0
+    for index, code in enumerate(squares):
+        mg += MG_SCORES[code][index]
+        eg += EG_SCORES[code][index]
+        phase += PHASES[code]
+    return mg, eg, phase
@@ -0,0 +1,57 @@
+"""
+64-bit Zobrist keys for positions.
+The board keeps its hash up to date as pieces move. compute_hash recomputes it from scratch, for debug checks.
+
+This module does not import the board module, so that the board can import the keys.
+"""
+import random
+
+# number of distinct piece codes and board squares, see board.py
+_NUM_CODES = 32
+_BOARD_SIZE = 120
+# piece codes without color bits (empty squares and guard regions) do not contribute to the hash
+_COLOR_MASK = 24
+
+_rng = random.Random(0x5a0b1571)
+
+
+def _key() -> int:
+    return _rng.getrandbits(64)
+
+
+# indexed by piece code, then square
+PIECE_KEYS = tuple(
+    tuple((_key() if code & _COLOR_MASK else 0) for _ in range(_BOARD_SIZE))
+    for code in range(_NUM_CODES)
+)
+
+# xor-ed in when black is to move
+SIDE_KEY = _key()
+
+# one key per castling right. Indexed by the full castling bitmask, so a change of rights is a single xor
+_CASTLING_RIGHT_KEYS = [_key() for _ in range(4)]
+CASTLING_KEYS = tuple(
+    _CASTLING_RIGHT_KEYS[0] * (rights & 1 != 0) ^
+    _CASTLING_RIGHT_KEYS[1] * (rights & 2 != 0) ^
+    _CASTLING_RIGHT_KEYS[2] * (rights & 4 != 0) ^
+    _CASTLING_RIGHT_KEYS[3] * (rights & 8 != 0)
+    for rights in range(16)
+)
+
+# indexed by square, only the file of the en-passant square matters
+_EP_FILE_KEYS = [_key() for _ in range(8)]
+EP_KEYS = tuple(_EP_FILE_KEYS[index % 10 - 1] if 1 <= index % 10 <= 8 else 0 for index in range(_BOARD_SIZE))
+
+
+def compute_hash(board) -> int:
+    """Compute the hash of the board from scratch"""
+    h = 0
+    for index, code in enumerate(board._board):
+        h ^= PIECE_KEYS[code][index]
+    # the side to move is a Color, where WHITE is True
+    if not board._turn:
+        h ^= SIDE_KEY
+    h ^= CASTLING_KEYS[board._castling]
+    if board._ep_index != -1:
+        h ^= EP_KEYS[board._ep_index]
+    return h
@@ -1,13 +1,21 @@
 import logging
-from typing import Iterator, List, Optional, Tuple
-
-from .core.board import (BISHOP, BLACK, KING, KNIGHT, PAWN, QUEEN, ROOK, WHITE,
-                         Board, Color, PieceName, dump_board, get_color,
-                         get_piece_list, get_raw_piece, is_capture)
-from .core.move import Move, gen_successor, gen_successor_from_move
-from .core.piece_movement_rules import (_get_promotions, _has_no_legal_moves,
-                                        get_piece_valid_squares, is_in_check)
+import time
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .core.board import (BISHOP, BLACK, CODE_TO_NAME, KING, KING_CODE,
+                         KNIGHT, PAWN, PAWN_CODE, QUEEN, QUEEN_CODE, ROOK,
+                         TYPE_MASK, WHITE, WHITE_FLAG, Board, Color,
+                         PieceName, get_piece_list, get_raw_piece)
+from .core.move import Move, encode_move
+from .core.piece_movement_rules import (CAPTURES, _has_no_legal_moves,
+                                        gen_checking_moves, gen_legal_moves,
+                                        is_in_check)
 from .core.utils import get_opposite_color
+from .evaluation import evaluate
+from .ordering import MoveOrdering, gen_staged_moves, is_quiet, pick_best
+from .proof_number import DEFAULT_TABLE_MB, DfpnSolver
+from .stats import ProofNumberStats, SearchStats
+from .transposition import EXACT, LOWER, UPPER, TranspositionTable
 
 piece_scores = {
     KNIGHT: 3,
@@ -18,158 +26,534 @@ piece_scores = {
     KING: 1000
 }
 CHECKMATE = 10000
-CHECK = 5
+# longest line the search can look at. Scores beyond CHECKMATE - MAX_PLY are mates
+MAX_PLY = 128
+MATE_THRESHOLD = CHECKMATE - MAX_PLY
+# value of each piece type in centipawns, indexed by the type bits of the piece code.
+# both kings are always on the board, so they are not counted
+PIECE_VALUES = tuple(
+    (piece_scores[CODE_TO_NAME[code | WHITE_FLAG]] * 100 if PAWN_CODE <= code < KING_CODE else 0)
+    for code in range(TYPE_MASK + 1)
+)
+# a capture is not searched in quiescence if winning the captured piece and this margin still does not reach alpha
+DELTA_MARGIN = 200
 MAX = True
 MIN = False
+# how often (in nodes) the clock is read while searching with a time budget
+TIME_CHECK_INTERVAL = 256
+# the null move is searched this many plies shallower than the real moves would be, one more in deep searches
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_DEEP_DEPTH = 7
+# iterations from this depth on start with a window of this many centipawns either side of the previous
+# score, which is widened on every failure
+ASPIRATION_MIN_DEPTH = 4
+ASPIRATION_WINDOW = 50
+# late move reductions: quiet moves after the first LMR_MIN_MOVES of a node are searched a ply shallower,
+# and two plies shallower after LMR_DEEP_MOVES, as long as LMR_MIN_DEPTH plies remain
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVES = 3
+LMR_DEEP_MOVES = 8
 
 
 def gen_all_moves(board: Board, color: Color) -> Iterator[Move]:
     """Generate all valid moves by given color.
     Do not generate moves where that color will be in check after the move"""
-    for location, piece in get_piece_list(board, color):
-        for dest in get_piece_valid_squares(board, location):
-            next_board = gen_successor(board, location, dest)
-            if not is_in_check(next_board, color):
-                prs = _get_promotions(piece, location, dest)
-                is_capture_move = is_capture(board, dest, piece)
-                if prs != []:
-                    for p in prs:
-                        yield Move(piece, location, dest, promotion=p, is_capture=is_capture_move)
-                else:
-                    # the destination here is chess notation, rather than index
-                    yield Move(piece, location, dest, is_capture=is_capture_move)
-
-
-def find_mate_in_n(board: Board, color: Color, n: int, stats_dict: Optional[dict] = None):
-    """Find a mate in at most n moves. If no such mate exist, will return a
-    non-CHECKMATE value in the first slot."""
-    if stats_dict is None:
-        stats_dict = {}
-    stats_dict.setdefault("nodes_explored", 0)
-    results = dls_minimax(board, (n - 1) * 2 + 1, MAX, stats_dict=stats_dict)
-    print("nodes explored=%d" % stats_dict['nodes_explored'])
-    return results
-
-
-def dls_minimax(board: Board, depth_remaining: int, turn: bool, last_move: Optional[Move] = None,
-                alpha: int =(-1 * CHECKMATE - 1), beta=(CHECKMATE + 1),
-                stats_dict: Optional[dict] = None) -> Tuple[int, list]:
-    """Return whether or not there exists a winning combination of moves.
-    Return this combination.
-    TODO: alpha-beta this"""
-
-    # color is the color of the player being mated
-    color = (BLACK if turn == MIN else WHITE)
-    if stats_dict:
-        stats_dict['nodes_explored'] += 1
+    return gen_legal_moves(board, color)
+
+
+def find_mate_in_n(board: Board, color: Color, n: int, stats: Optional[SearchStats] = None,
+                   tt: Optional[TranspositionTable] = None, workers: Optional[int] = None,
+                   checks_only: bool = False):
+    """Find a mate in at most n moves for color. If no such mate exist, will return a
+    non-CHECKMATE value in the first slot. The score is from the point of view of color.
+    :param stats: the counters of the search are added to it
+    :param workers: if more than 1, the root moves are searched by that many processes (see smp.py).
+        They share their own transposition table, so tt is not used
+    :param checks_only: only look for mates where every attacker move is a check"""
+    if stats is None:
+        stats = SearchStats()
+    max_plies = (n - 1) * 2 + 1
+    if workers is not None and workers > 1:
+        # imported here, as smp.py imports this module
+        from .smp import parallel_mate_search
+        score, moves = parallel_mate_search(board, color, max_plies, workers, stats=stats,
+                                            checks_only=checks_only)
+    else:
+        if tt is None:
+            tt = TranspositionTable()
+        tt.new_search()
+        score, moves = dls_minimax(board, max_plies, (MAX if color == WHITE else MIN), stats=stats, tt=tt,
+                                   checks_only=checks_only)
+        if color != WHITE:
+            # dls_minimax scores for white
+            score = -1 * score
+    if score >= CHECKMATE - max_plies:
+        score = CHECKMATE
+    elif score <= -1 * (CHECKMATE - max_plies):
+        score = -1 * CHECKMATE
+    logging.info("mate in %d: %s", n, stats.to_log_line())
+    return score, moves
+
+
+def find_mate_in_n_pns(board: Board, color: Color, n: int, stats: Optional[ProofNumberStats] = None,
+                       size_mb: float = DEFAULT_TABLE_MB, max_nodes: Optional[int] = None):
+    """Same as find_mate_in_n, using proof-number search (see proof_number.py) instead of alpha-beta.
+    If there is no mate, or the node budget runs out, return 0 and an empty line.
+    :param stats: gets the proof and disproof node counts along with the nodes
+    :param size_mb: memory cap of the proof-number table"""
+    if stats is None:
+        stats = ProofNumberStats()
+    start = time.perf_counter()
+    solver = DfpnSolver(size_mb, max_nodes)
+    proven, moves = solver.solve(board, color, (n - 1) * 2 + 1)
+    stats.nodes += solver.nodes
+    stats.proof_nodes += solver.proof_nodes
+    stats.disproof_nodes += solver.disproof_nodes
+    stats.table_entries = len(solver.table)
+    stats.table_collections += solver.collections
+    stats.solved = proven is not None
+    stats.elapsed += time.perf_counter() - start
+    logging.info("mate in %d (proof-number search): %s", n, stats.to_log_line())
+    return (CHECKMATE if proven else 0), moves
+
+
+def is_mate_score(score: int) -> bool:
+    return score >= MATE_THRESHOLD or score <= -1 * MATE_THRESHOLD
+
+
+def score_to_tt(score: int, ply: int) -> int:
+    """Mate scores are stored relative to the node, rather than to the root"""
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    elif score <= -1 * MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def score_from_tt(score: int, ply: int) -> int:
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    elif score <= -1 * MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+class SearchAborted(Exception):
+    """Raised inside the search when the time or node budget runs out"""
+    pass
+
+
+class SearchContext(object):
+    def __init__(self, tt: Optional[TranspositionTable] = None,
+                 deadline: Optional[float] = None, max_nodes: Optional[int] = None,
+                 mate_search: bool = False, should_stop: Optional[Callable[[], bool]] = None,
+                 checks_only: bool = False, null_move: bool = True, reductions: bool = True):
+        """State shared by all the nodes of one search.
+        pv is a triangular table: row ply holds the best line found from that ply, in columns ply..pv_length[ply] - 1
+        :param deadline: value of time.monotonic() after which the search is aborted
+        :param max_nodes: the search is aborted after visiting this many nodes
+        :param mate_search: only look for mates. Positions at the horizon score 0 instead of being evaluated,
+            so only checks are searched one ply before it
+        :param should_stop: polled along with the clock. The search is aborted once it returns True
+        :param checks_only: in a mate search, the attacker (the side to move with an odd depth remaining) only
+            plays checks at every ply. Faster, but misses mates which start with a quiet move
+        :param null_move: try passing the turn before searching the moves, and cut off if that is enough to
+            beat beta (null-move pruning)
+        :param reductions: search the quiet moves ordered late a ply or two shallower (late move reductions)
+        Both can hide a forced line, so mate searches never use them
+        """
+        self.tt = tt
+        self.mate_search = mate_search
+        self.checks_only = checks_only
+        self.null_move = null_move and not mate_search
+        self.reductions = reductions and not mate_search
+        self.ordering = MoveOrdering(use_see=not mate_search)
+        # counters of this search only. The node count is also the one the node budget is checked against
+        self.stats = SearchStats()
+        self.pv = [[None] * (MAX_PLY + 1) for _ in range(MAX_PLY + 1)]  # type: List[List[Optional[Move]]]
+        self.pv_length = [0] * (MAX_PLY + 2)
+        # the line found by the previous iteration, packed with encode_move.
+        # it is searched first while follow_pv is set
+        self.prev_pv = []  # type: List[int]
+        self.follow_pv = False
+
+        self.deadline = deadline
+        self.max_nodes = max_nodes
+        self.should_stop = should_stop
+        # node count at which check_budget is next called
+        self.next_check = 0
+        self.can_abort = False
+        self._schedule_check()
+
+    @property
+    def nodes(self) -> int:
+        return self.stats.nodes
+
+    def principal_variation(self) -> List[Move]:
+        return self.pv[0][:self.pv_length[0]]
+
+    def _schedule_check(self) -> None:
+        next_check = -1
+        if self.deadline is not None or self.should_stop is not None:
+            next_check = self.nodes + TIME_CHECK_INTERVAL
+        if self.max_nodes is not None:
+            node_check = max(self.max_nodes, self.nodes + 1)
+            if next_check == -1 or node_check < next_check:
+                next_check = node_check
+        self.next_check = next_check
+
+    def allow_abort(self) -> None:
+        """Called once there is a completed result to fall back on"""
+        self.can_abort = True
+        self._schedule_check()
+
+    def check_budget(self) -> None:
+        """Raise SearchAborted if the search is over its budget"""
+        if self.can_abort:
+            if self.max_nodes is not None and self.nodes >= self.max_nodes:
+                raise SearchAborted()
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                raise SearchAborted()
+            if self.should_stop is not None and self.should_stop():
+                raise SearchAborted()
+        self._schedule_check()
+
+
+def has_non_pawn_material(board: Board, color: Color) -> bool:
+    """Does color have a piece other than its king and pawns?
+    Without one, zugzwang is common, and passing the turn is not a safe guess of the worst case"""
+    squares = board._board
+    for index in board._pieces[color]:
+        if squares[index] & TYPE_MASK not in (PAWN_CODE, KING_CODE):
+            return True
+    return False
+
+
+def negamax(board: Board, depth_remaining: int, ply: int, alpha: int, beta: int, color: Color,
+            ctx: SearchContext, allow_null: bool = True) -> int:
+    """Fail-soft alpha-beta search of the position, with color to move.
+    Return the score from the point of view of color. The best line is left in ctx.pv[ply].
+    Checkmate scores are CHECKMATE less the number of plies from the root, so shorter mates score higher.
+    :param ply: distance from the root of the search
+    :param allow_null: False right after a null move, so that two are never made in a row"""
+    stats = ctx.stats
+    stats.nodes += 1
+    if stats.nodes == ctx.next_check:
+        ctx.check_budget()
+    ctx.pv_length[ply] = ply
+    tt = ctx.tt
+
+    hash_move = 0
+    if tt is not None:
+        stats.tt_probes += 1
+        entry = tt.probe(board.hash)
+        if entry is not None:
+            stats.tt_hits += 1
+            tt_depth, tt_score, tt_bound, hash_move = entry
+            tt_score = score_from_tt(tt_score, ply)
+            # only cut off when the stored bound proves the node is outside the window,
+            # so the principal variation is never cut short
+            if tt_depth >= depth_remaining:
+                if tt_bound != UPPER and tt_score >= beta:
+                    return tt_score
+                if tt_bound != LOWER and tt_score <= alpha:
+                    return tt_score
+
+    if depth_remaining == 0 or ply >= MAX_PLY:
+        if not ctx.mate_search:
+            return quiescence(board, ply, alpha, beta, color, ctx)
+        if _has_no_legal_moves(board, color):
+            return -1 * (CHECKMATE - ply) if is_in_check(board, color) else 0
+        # once we reach the max depth, just return 0 for the score
+        return 0
 
-    if _has_no_legal_moves(board, color):
+    if ctx.follow_pv:
+        # the previous iteration's line is searched first
+        if ply < len(ctx.prev_pv):
+            hash_move = ctx.prev_pv[ply]
+        else:
+            ctx.follow_pv = False
+
+    opponent = get_opposite_color(color)
+    in_check = ((ctx.null_move or ctx.reductions) and is_in_check(board, color))
+    # null-move pruning: if the opponent, given a free move, still cannot get below beta, neither can any of
+    # the real moves. Not done on the previous iteration's line, nor where zugzwang makes passing the best move
+    if (allow_null and ctx.null_move and not ctx.follow_pv and ply > 0 and depth_remaining >= 2
+            and not in_check and beta < MATE_THRESHOLD and evaluate(board, color) >= beta
+            and has_non_pawn_material(board, color)):
+        reduction = NULL_MOVE_REDUCTION + (1 if depth_remaining >= NULL_MOVE_DEEP_DEPTH else 0)
+        board.make_null_move()
+        score = -1 * negamax(board, max(0, depth_remaining - 1 - reduction), ply + 1, -1 * beta, -1 * beta + 1,
+                             opponent, ctx, allow_null=False)
+        board.unmake_move()
+        if score >= beta:
+            stats.null_cutoffs += 1
+            # the null move does not prove a mate
+            return (beta if score >= MATE_THRESHOLD else score)
+
+    alpha_orig = alpha
+    best_score = -1 * CHECKMATE - 1
+    best_move = None  # type: Optional[Move]
+    pv = ctx.pv
+    pv_length = ctx.pv_length
+    killers = ctx.ordering.killers_at(ply)
+    moves_searched = 0
+    # a quiet move on the last ply of a mate search reaches the horizon, which scores 0, so only checks can
+    # do better
+    checks_only = ctx.mate_search and (depth_remaining == 1 or (ctx.checks_only and depth_remaining % 2 == 1))
+    if checks_only:
+        checks = list(gen_checking_moves(board, color))
+        moves = pick_best(checks, ctx.ordering.score_moves(board, checks, ply, hash_move))  # type: Iterator[Move]
+    else:
+        moves = gen_staged_moves(board, color, ctx.ordering, ply, hash_move)
+    for move in moves:
+        board.make_move(move)
+        # late move reductions: the ordering puts the moves most likely to be best first, so a quiet move far
+        # down the list is first searched shallower, and again at full depth only if it beats alpha
+        reduction = 0
+        if (ctx.reductions and moves_searched >= LMR_MIN_MOVES and depth_remaining >= LMR_MIN_DEPTH
+                and not in_check and is_quiet(move) and encode_move(move) not in killers
+                and not is_in_check(board, opponent)):
+            reduction = (2 if moves_searched >= LMR_DEEP_MOVES and depth_remaining > LMR_MIN_DEPTH else 1)
+        if moves_searched == 0:
+            score = -1 * negamax(board, depth_remaining - 1, ply + 1, -1 * beta, -1 * alpha, opponent, ctx)
+        else:
+            # principal variation search: the first move is expected to be the best, so the others are only
+            # searched with a zero window to show they do not beat alpha, and again with the full window if they do
+            score = -1 * negamax(board, depth_remaining - 1 - reduction, ply + 1, -1 * alpha - 1, -1 * alpha,
+                                 opponent, ctx)
+            if reduction and score > alpha:
+                stats.lmr_researches += 1
+                score = -1 * negamax(board, depth_remaining - 1, ply + 1, -1 * alpha - 1, -1 * alpha, opponent, ctx)
+            if alpha < score < beta:
+                stats.pvs_researches += 1
+                score = -1 * negamax(board, depth_remaining - 1, ply + 1, -1 * beta, -1 * alpha, opponent, ctx)
+        board.unmake_move()
+        moves_searched += 1
+        # every move after the first one leaves the previous line
+        ctx.follow_pv = False
+        if score > best_score:
+            best_score = score
+            if score > alpha:
+                alpha = score
+                best_move = move
+                # the line from this ply is the move followed by the line from the next ply
+                child_length = pv_length[ply + 1]
+                row = pv[ply]
+                row[ply] = move
+                row[ply + 1:child_length] = pv[ply + 1][ply + 1:child_length]
+                pv_length[ply] = max(child_length, ply + 1)
+        # a mate is found: shorter mates are searched first, so stop looking
+        if best_score >= MATE_THRESHOLD:
+            logging.info("[%d depth remaining] Checkmate found for %s, not checking any more nodes",
+                         depth_remaining, color)
+            break
+        if alpha >= beta:
+            stats.beta_cutoffs += 1
+            if moves_searched == 1:
+                stats.first_move_cutoffs += 1
+            ctx.ordering.record_cutoff(board, move, ply, depth_remaining)
+            break
+
+    quiet_move = None  # type: Optional[Move]
+    if best_score == -1 * CHECKMATE - 1 and checks_only:
+        quiet_move = next(gen_legal_moves(board, color), None)
+    if quiet_move is not None:
+        # no checks, but any other move reaches the horizon and scores 0
+        best_score = 0
+        if best_score > alpha:
+            pv[ply][ply] = quiet_move
+            pv_length[ply] = ply + 1
+    elif best_score == -1 * CHECKMATE - 1:
+        # no legal moves
         if is_in_check(board, color):
             logging.info("[%d depth remaining] Reached terminal condition: %s is in checkmate", depth_remaining, color)
-            logging.debug("Previous move is %s", str(last_move))
+            return -1 * (CHECKMATE - ply)
+        logging.debug("Reached terminal condition: %s is in stalemate", color)
+        return 0
 
-            for row in dump_board(board):
-                logging.info(row)
-            if turn == MIN:
-                return (CHECKMATE, [last_move])
-            else:
-                return (-1 * CHECKMATE, [last_move])
+    if tt is not None:
+        if best_score >= beta or best_score >= MATE_THRESHOLD:
+            bound = LOWER
+        elif best_score <= alpha_orig:
+            bound = UPPER
         else:
-            logging.debug("Reached terminal condition: %s is in stalemate", color)
-            return (0, [last_move])
-    elif depth_remaining == 0:
-        # once we reach the max depth, just return 0 for the score
-        logging.debug("Max depth reached, exit 0")
-        return (0, [last_move])
-    elif turn == MAX:
-        logging.debug("[%d] Finding best move for player %s", depth_remaining, color)
-        best_move = []  # type: List[Move]
-        move_gen_flag = False
-
-        def _score_move(move):
-            return score_move(board, move)
-
-        # score each potential move
-        # order in order of score
-        for g_move in sorted(gen_all_moves(board, color), key=_score_move, reverse=True):
-            move_gen_flag = True
-            logging.debug("[%d] Looking at move %s",
-                          depth_remaining, g_move.show(board))
-            b_new = gen_successor_from_move(board, g_move)
-            a, move = dls_minimax(b_new, depth_remaining - 1, MIN, g_move, alpha, beta, stats_dict)
-            if a > alpha:
-                best_move = move
-                alpha = a
-
-            # TODO there should be some sort of theory on why this is good
-            # but for now, the idea seems solid
-            if alpha >= CHECKMATE:
-                logging.info("[%d depth remaining] Checkmate found as MAX, not checking any more nodes", depth_remaining)
-                break
-
-            if alpha >= beta:
-                logging.debug("beta cutoff for %s", color)
-                logging.debug("exceeded beta value %d with alpha %d",
-                              beta, alpha)
-                break
-
-        if not move_gen_flag:
-            # this should be caught by first if statement
-            raise Exception("No moves generated, returning empty set")
-
-        if last_move is not None:
-            best_move.insert(0, last_move)
-
-        logging.debug("returning alpha=%d", alpha)
-        return (alpha, best_move)
-    elif turn == MIN:
-        logging.debug("[%d depth remaining] Finding best move for player %s", depth_remaining, color)
-        best_move = []
-        move_gen_flag = False
-
-        def _score_move(move):
-            return score_move(board, move)
-
-        # score each potential move
-        # order in order of score
-        for g_move in sorted(gen_all_moves(board, color), key=_score_move, reverse=True):
-            move_gen_flag = True
-            logging.debug("[%d] Looking at move %s",
-                          depth_remaining, g_move.show(board))
-            b_new = gen_successor_from_move(board, g_move)
-            b, move = dls_minimax(b_new, depth_remaining - 1, MAX, g_move, alpha, beta, stats_dict)
-            if b < beta or (b == beta and len(move) > len(best_move)):
-                beta = b
-                best_move = move
-
-            if beta <= -1 * CHECKMATE:
-                logging.info("[%d depth remaining] Checkmate found as MIN, not checking any more nodes", depth_remaining)
-                break
-
-            if alpha >= beta:
-                logging.debug("alpha cutoff")
-                break
-
-        if not move_gen_flag:
-            # this should be caught by first if statement
-            raise Exception("No moves generated, returning empty set")
-
-        if last_move is not None:
-            best_move.insert(0, last_move)
-
-        logging.debug("Returning beta=%d", beta)
-        return (beta, best_move)
-    raise Exception("should never get here - missing return statement")
+            bound = EXACT
+        tt.store(board.hash, depth_remaining, score_to_tt(best_score, ply), bound,
+                 encode_move(best_move) if best_move is not None else 0)
+    return best_score
+
+
+def quiescence(board: Board, ply: int, alpha: int, beta: int, color: Color, ctx: SearchContext) -> int:
+    """Search captures (and promotions) only, until the position is quiet, so that the evaluation at the horizon
+    does not miss a piece hanging. The side to move may stand pat: take the static evaluation instead of capturing.
+    When in check every evasion is searched instead, and there is no standing pat.
+    The moves searched here are not added to the principal variation"""
+    stats = ctx.stats
+    stats.nodes += 1
+    stats.qnodes += 1
+    if stats.nodes == ctx.next_check:
+        ctx.check_budget()
+    ctx.pv_length[ply] = ply
+    opponent = get_opposite_color(color)
+
+    if is_in_check(board, color):
+        best_score = -1 * (CHECKMATE - ply)
+        if ply >= MAX_PLY:
+            return evaluate(board, color)
+        for move in gen_legal_moves(board, color):
+            board.make_move(move)
+            score = -1 * quiescence(board, ply + 1, -1 * beta, -1 * alpha, opponent, ctx)
+            board.unmake_move()
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        # without any legal move, this is checkmate
+        return best_score
+
+    stand_pat = evaluate(board, color)
+    if stand_pat >= beta or ply >= MAX_PLY:
+        return stand_pat
+    if stand_pat > alpha:
+        alpha = stand_pat
+    best_score = stand_pat
+
+    squares = board._board
+    captures = list(gen_legal_moves(board, color, CAPTURES))
+    scores = ctx.ordering.score_moves(board, captures, ply)
+    for i, move in enumerate(pick_best(captures, scores)):
+        if scores[i] < 0:
+            # the rest lose material in the exchange on their square
+            break
+        # delta pruning: skip captures which cannot raise alpha even with a margin for positional gains
+        gain = (PIECE_VALUES[PAWN_CODE] if move.is_en_passant else PIECE_VALUES[squares[move.dest] & TYPE_MASK])
+        if move.promotion:
+            gain += PIECE_VALUES[QUEEN_CODE] - PIECE_VALUES[PAWN_CODE]
+        if stand_pat + gain + DELTA_MARGIN <= alpha:
+            continue
+        board.make_move(move)
+        score = -1 * quiescence(board, ply + 1, -1 * beta, -1 * alpha, opponent, ctx)
+        board.unmake_move()
+        if score > best_score:
+            best_score = score
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+    return best_score
+
+
+def aspiration_search(board: Board, depth: int, guess: int, color: Color, ctx: SearchContext) -> int:
+    """Search the root with a narrow window around guess, the score of the previous iteration.
+    A score outside the window is only a bound, so the search is repeated with the window widened on that side,
+    twice as far each time, until the score falls inside it"""
+    window = ASPIRATION_WINDOW
+    alpha = max(guess - window, -1 * CHECKMATE - 1)
+    beta = min(guess + window, CHECKMATE + 1)
+    while True:
+        ctx.follow_pv = True
+        score = negamax(board, depth, 0, alpha, beta, color, ctx)
+        if score <= alpha and alpha > -1 * CHECKMATE - 1:
+            alpha = max(score - window, -1 * CHECKMATE - 1)
+        elif score >= beta and beta < CHECKMATE + 1:
+            beta = min(score + window, CHECKMATE + 1)
+        else:
+            return score
+        ctx.stats.aspiration_researches += 1
+        window *= 2
+
+
+def search(board: Board, color: Color, time_ms: Optional[float] = None, nodes: Optional[int] = None,
+           max_depth: int = MAX_PLY, tt: Optional[TranspositionTable] = None,
+           stats: Optional[SearchStats] = None, start_depth: int = 1,
+           should_stop: Optional[Callable[[], bool]] = None, null_move: bool = True,
+           reductions: bool = True) -> Tuple[int, List[Move]]:
+    """Search the position with color to move by iterative deepening, until max_depth is reached,
+    a mate is found, or the time or node budget runs out.
+    Return the score from the point of view of color and the best line of the deepest completed iteration.
+    The first iteration is always completed, so there is a move to play whenever the position has one.
+    :param time_ms: wall-clock budget in milliseconds
+    :param nodes: node budget
+    :param stats: the counters of the search are added to it, with the nodes and time of each completed iteration
+    :param start_depth: depth of the first iteration
+    :param should_stop: polled during the search, which is aborted once it returns True
+    :param null_move: use null-move pruning
+    :param reductions: use late move reductions"""
+    start = time.monotonic()
+    deadline = (start + time_ms / 1000.0 if time_ms is not None else None)
+    if tt is None:
+        tt = TranspositionTable()
+    tt.new_search()
+    ctx = SearchContext(tt, deadline, nodes, should_stop=should_stop, null_move=null_move, reductions=reductions)
+    undo_depth = len(board._undo)
+
+    score = 0
+    best_line = []  # type: List[Move]
+    depth = 0
+    iteration_start = start
+    for depth in range(min(start_depth, max_depth), max_depth + 1):
+        ctx.prev_pv = [encode_move(move) for move in best_line]
+        iteration_nodes = ctx.nodes
+        try:
+            if depth >= ASPIRATION_MIN_DEPTH and best_line != []:
+                iteration_score = aspiration_search(board, depth, score, color, ctx)
+            else:
+                ctx.follow_pv = True
+                iteration_score = negamax(board, depth, 0, -1 * CHECKMATE - 1, CHECKMATE + 1, color, ctx)
+        except SearchAborted:
+            # take back the moves of the unfinished line
+            while len(board._undo) > undo_depth:
+                board.unmake_move()
+            depth -= 1
+            logging.debug("Search aborted during iteration %d", depth + 1)
+            break
+        score = iteration_score
+        best_line = ctx.principal_variation()
+        ctx.allow_abort()
+        now = time.monotonic()
+        elapsed = now - start
+        ctx.stats.record_iteration(depth, ctx.nodes - iteration_nodes, now - iteration_start)
+        iteration_start = now
+        logging.debug("depth=%d score=%d nodes=%d time=%.3fs", depth, score, ctx.nodes, elapsed)
+        if is_mate_score(score) or best_line == []:
+            # a deeper search cannot find a shorter mate
+            break
+        if deadline is not None and start + 2 * elapsed >= deadline:
+            # the next iteration would not finish in time
+            break
+
+    if stats is not None:
+        ctx.stats.elapsed = time.monotonic() - start
+        stats.merge(ctx.stats)
+    return (score, best_line)
 
 
-def score_move(board: Board, move: Move):
-    """Score moves which give a check higher than those which do not."""
-    moving_color = get_color(board, move.src)
-    new_board = gen_successor_from_move(board, move)
-    if is_in_check(new_board, get_opposite_color(moving_color)):
-        return CHECK
+def dls_minimax(board: Board, depth_remaining: int, turn: bool, last_move: Optional[Move] = None,
+                alpha: int =(-1 * CHECKMATE - 1), beta=(CHECKMATE + 1),
+                stats: Optional[SearchStats] = None,
+                tt: Optional[TranspositionTable] = None, checks_only: bool = False) -> Tuple[int, list]:
+    """Search the position with MAX (white) or MIN (black) to move.
+    Return the score from the point of view of MAX, and the best line (starting with last_move, if given).
+    :param stats: the counters of the search are added to it"""
+    color = (WHITE if turn == MAX else BLACK)
+    ctx = SearchContext(tt, mate_search=True, checks_only=checks_only)
+    start = time.monotonic()
+    if turn == MAX:
+        score = negamax(board, depth_remaining, 0, alpha, beta, color, ctx)
     else:
-        return 0
+        score = -1 * negamax(board, depth_remaining, 0, -1 * beta, -1 * alpha, color, ctx)
+    if stats is not None:
+        elapsed = time.monotonic() - start
+        ctx.stats.elapsed = elapsed
+        ctx.stats.record_iteration(depth_remaining, ctx.nodes, elapsed)
+        stats.merge(ctx.stats)
+    moves = ctx.principal_variation()  # type: List[Optional[Move]]
+    if last_move is not None:
+        moves.insert(0, last_move)
+    return (score, moves)
 
 
 def score_piece(piece: PieceName, location):
@@ -183,6 +567,6 @@ def score_board(board):
                      for location, piece in get_piece_list(board, WHITE)])
 
     black_pts = sum([score_piece(piece, location)
-                     for location, piece in get_piece_list(board, "B")])
+                     for location, piece in get_piece_list(board, BLACK)])
 
     return white_pts - black_pts
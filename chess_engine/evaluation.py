@@ -0,0 +1,18 @@
+"""
+Static evaluation of a position, in centipawns.
+The material and piece-square terms are running totals kept by the board (see core/pst.py),
+so evaluating a position does not look at the pieces at all.
+"""
+from .core.board import WHITE, Board, Color
+from .core.pst import MAX_PHASE
+
+
+def evaluate(board: Board, color: Color) -> int:
+    """Material and piece-square score from the point of view of color,
+    blended between the middlegame and endgame scores by the material left on the board"""
+    phase = board._phase
+    if phase > MAX_PHASE:
+        # possible after promotions
+        phase = MAX_PHASE
+    score = (board._mg * phase + board._eg * (MAX_PHASE - phase)) // MAX_PHASE
+    return (score if color == WHITE else -1 * score)
@@ -0,0 +1,202 @@
+"""
+Move ordering for the search. Moves are scored without being made on the board, and searched in this order:
+
+1. the hash move
+2. captures and promotions: most valuable victim first and then least valuable attacker (MVV-LVA)
+3. killer moves: quiet moves which caused a cutoff at the same ply elsewhere in the tree
+4. the remaining quiet moves: those giving a direct check first, then by their history score
+5. captures which lose material according to static exchange evaluation (see.py)
+
+gen_staged_moves only generates each of these groups once the previous one is exhausted without a cutoff,
+and pick_best sorts a group lazily, so that a cutoff on the first move does not pay for ordering the rest.
+"""
+from typing import Iterator, List, Optional, Sequence
+
+from .core.board import (BOARD_SIZE, COLOR_FLAGS, KNIGHT_CODE, NAME_TO_CODE,
+                         PAWN_CODE, QUEEN_CODE, TYPE_MASK, WHITE_FLAG, Board,
+                         Color)
+from .core.move import Move, decode_move, encode_move
+from .core.piece_movement_rules import (CAPTURES, QUIETS, _get_promotions,
+                                        gen_legal_moves, gives_direct_check,
+                                        is_legal_move)
+from .see import SEE_VALUES, see
+
+HASH_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 24
+# below every quiet move
+LOSING_CAPTURE_SCORE = -1 * CAPTURE_SCORE
+CHECK_SCORE = 1 << 22
+KILLER_SCORE = 1 << 20
+# history scores are halved once any of them reaches this value, so they stay below the killers
+MAX_HISTORY = 1 << 19
+
+# number of killer moves kept per ply
+NUM_KILLERS = 2
+
+# number of piece codes, see board.py
+_NUM_CODES = 32
+
+
+def is_quiet(move: Move) -> bool:
+    """Neither a capture (en-passant captures are not flagged is_capture) nor a promotion"""
+    return not (move.is_capture or move.is_en_passant or move.promotion)
+
+
+def score_move(board: Board, move: Move, use_see: bool = True) -> int:
+    """Static score of the move, without history: captures and promotions, then checks.
+    Captures and promotions which lose material score below zero, by how much they lose
+    :param use_see: if False, losing captures are not told apart from the others"""
+    squares = board._board
+    piece = squares[move.src]
+    attacker = piece & TYPE_MASK
+    score = 0
+    if move.is_capture or move.is_en_passant:
+        victim = (PAWN_CODE if move.is_en_passant else squares[move.dest] & TYPE_MASK)
+        # taking a piece worth at least as much as the capturing one cannot lose material
+        if use_see and (SEE_VALUES[victim] < SEE_VALUES[attacker] or move.promotion):
+            balance = see(board, move)
+            if balance < 0:
+                return LOSING_CAPTURE_SCORE + balance
+        score += CAPTURE_SCORE + victim * 8 - attacker
+    if move.promotion and NAME_TO_CODE[move.promotion] & TYPE_MASK == QUEEN_CODE:
+        if use_see and not move.is_capture:
+            balance = see(board, move)
+            if balance < 0:
+                return LOSING_CAPTURE_SCORE + balance
+        score += CAPTURE_SCORE + QUEEN_CODE * 8
+    # the king of the other color
+    king = board._kings[(piece & WHITE_FLAG) == 0]
+    if king != -1 and gives_direct_check(board, move, king):
+        score += CHECK_SCORE
+    return score
+
+
+class MoveOrdering(object):
+    def __init__(self, use_see: bool = True):
+        """Killer moves and the history table, shared by all the nodes of one search
+        :param use_see: search the captures which lose material last. Mate searches turn this off, as the
+            mating line often starts with a sacrifice"""
+        self.use_see = use_see
+        # packed moves, NUM_KILLERS per ply
+        self.killers = []  # type: List[List[int]]
+        # indexed by piece code * 128 + destination square
+        self.history = [0] * (_NUM_CODES * 128)
+
+    def clear(self) -> None:
+        self.killers = []
+        self.history = [0] * (_NUM_CODES * 128)
+
+    def killers_at(self, ply: int) -> List[int]:
+        while len(self.killers) <= ply:
+            self.killers.append([0] * NUM_KILLERS)
+        return self.killers[ply]
+
+    def score_moves(self, board: Board, moves: Sequence[Move], ply: int, hash_move: int = 0) -> List[int]:
+        """Score each of the moves, higher is searched first
+        :param hash_move: the best move from the transposition table, packed with encode_move"""
+        killers = self.killers_at(ply)
+        history = self.history
+        squares = board._board
+        scores = []
+        for move in moves:
+            packed = encode_move(move)
+            if packed == hash_move:
+                scores.append(HASH_MOVE_SCORE)
+                continue
+            score = score_move(board, move, self.use_see)
+            if is_quiet(move):
+                if packed in killers:
+                    score += KILLER_SCORE - killers.index(packed)
+                score += history[(squares[move.src] << 7) | move.dest]
+            scores.append(score)
+        return scores
+
+    def record_cutoff(self, board: Board, move: Move, ply: int, depth_remaining: int) -> None:
+        """Remember a quiet move which caused a beta cutoff. Called before the move is made"""
+        if not is_quiet(move):
+            return
+        killers = self.killers_at(ply)
+        packed = encode_move(move)
+        if killers[0] != packed:
+            killers[1:] = killers[:-1]
+            killers[0] = packed
+        history = self.history
+        slot = (board._board[move.src] << 7) | move.dest
+        history[slot] += depth_remaining * depth_remaining
+        if history[slot] >= MAX_HISTORY:
+            for i in range(len(history)):
+                history[i] >>= 1
+
+
+def pick_best(moves: List[Move], scores: List[int]) -> Iterator[Move]:
+    """Yield the moves from the highest score to the lowest.
+    Each step selects the best remaining move, so moves after a cutoff are never ordered"""
+    n = len(moves)
+    for i in range(n):
+        best = max(range(i, n), key=scores.__getitem__)
+        if best != i:
+            moves[i], moves[best] = moves[best], moves[i]
+            scores[i], scores[best] = scores[best], scores[i]
+        yield moves[i]
+
+
+def decode_legal_move(board: Board, color: Color, packed: int) -> Optional[Move]:
+    """Decode a move from the transposition table or the killer table.
+    Return None unless it is a legal move for color in this position"""
+    src = packed & 127
+    dest = (packed >> 7) & 127
+    promotion = packed >> 14
+    if src >= BOARD_SIZE or dest >= BOARD_SIZE:
+        return None
+    piece = board._board[src]
+    if not piece & COLOR_FLAGS[color]:
+        return None
+    if promotion != 0 and not KNIGHT_CODE <= promotion <= QUEEN_CODE:
+        return None
+    if (promotion != 0) != (_get_promotions(piece, src, dest) != []):
+        return None
+    if not is_legal_move(board, src, dest):
+        return None
+    return decode_move(board, packed)
+
+
+def gen_staged_moves(board: Board, color: Color, ordering: MoveOrdering, ply: int,
+                     hash_move: int = 0) -> Iterator[Move]:
+    """Yield every legal move of color once, in stages: the hash move, captures and promotions,
+    killer moves, the remaining quiet moves, then the losing captures.
+    A stage is only generated when the search asks for a move after the previous stage ran out"""
+    tried = []  # type: List[int]
+    if hash_move:
+        move = decode_legal_move(board, color, hash_move)
+        if move is not None:
+            tried.append(hash_move)
+            yield move
+
+    captures = list(gen_legal_moves(board, color, CAPTURES))
+    scores = ordering.score_moves(board, captures, ply)
+    losing = []  # type: List[Move]
+    losing_scores = []  # type: List[int]
+    for i, move in enumerate(pick_best(captures, scores)):
+        if scores[i] < 0:
+            # the rest lose material, and are searched after the quiet moves
+            losing = captures[i:]
+            losing_scores = scores[i:]
+            break
+        if encode_move(move) not in tried:
+            yield move
+
+    for killer in ordering.killers_at(ply):
+        if killer and killer not in tried:
+            move = decode_legal_move(board, color, killer)
+            if move is not None and is_quiet(move):
+                tried.append(killer)
+                yield move
+
+    quiets = list(gen_legal_moves(board, color, QUIETS))
+    for move in pick_best(quiets, ordering.score_moves(board, quiets, ply)):
+        if encode_move(move) not in tried:
+            yield move
+
+    for move in pick_best(losing, losing_scores):
+        if encode_move(move) not in tried:
+            yield move
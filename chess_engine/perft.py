@@ -0,0 +1,182 @@
+"""
+Perft: count the leaf nodes of the legal move tree to a fixed depth.
+The counts are compared against known values to check the move generator, and timed to measure its throughput.
+Divide reports the count below each root move, to find which move a generator bug is under.
+
+parallel_perft and parallel_divide split the tree a ply or two below the root and count each subtree
+in a separate process. Positions are sent to the workers with board_to_bytes.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .core.board import (Board, Color, board_to_bytes, bytes_to_board,
+                         fen_to_board, index_to_sq)
+from .core.move import Move, gen_successor_from_move
+from .core.piece_movement_rules import gen_legal_moves
+
+# (name, FEN, expected node count at depth 1, 2, 3, ...)
+# from https://www.chessprogramming.org/Perft_Results
+PERFT_SUITE = [
+    ("start", "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+     [20, 400, 8902, 197281]),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     [48, 2039, 97862, 4085603]),
+    ("position 3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     [14, 191, 2812, 43238]),
+    ("position 4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     [6, 264, 9467, 422333]),
+    ("position 5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     [44, 1486, 62379, 2103487]),
+    ("position 6", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     [46, 2079, 89890, 3894594]),
+]
+
+
+def move_to_uci(move: Move) -> str:
+    """Long algebraic notation, as used by divide: e2e4, e7e8q"""
+    return "%s%s%s" % (index_to_sq(move.src), index_to_sq(move.dest),
+                       (move.promotion.lower() if move.promotion else ""))
+
+
+def perft(board: Board, depth: int, color: Optional[Color] = None) -> int:
+    """Number of leaf nodes of the legal move tree of the given depth.
+    :param color: side to move, by default the side to move on the board"""
+    if color is None:
+        color = board.turn
+    if depth == 0:
+        return 1
+    if depth == 1:
+        # the generator is fully legal, so the leaves do not need to be made
+        return sum(1 for _ in gen_legal_moves(board, color))
+    nodes = 0
+    opp_color = not color
+    for move in gen_legal_moves(board, color):
+        board.make_move(move)
+        nodes += perft(board, depth - 1, opp_color)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board: Board, depth: int, color: Optional[Color] = None) -> Dict[str, int]:
+    """perft of each root move, keyed by the move in long algebraic notation"""
+    if color is None:
+        color = board.turn
+    counts = {}  # type: Dict[str, int]
+    for move in gen_legal_moves(board, color):
+        board.make_move(move)
+        counts[move_to_uci(move)] = perft(board, depth - 1, not color)
+        board.unmake_move()
+    return counts
+
+
+def _perft_task(task: Tuple[bytes, int]) -> int:
+    """Run in a worker process"""
+    data, depth = task
+    return perft(bytes_to_board(data), depth)
+
+
+def _split(board: Board, depth: int, split_depth: int) -> List[Tuple[str, bytes, int]]:
+    """Subtrees split_depth plies below the root, as (root move, serialised position, remaining depth)"""
+    tasks = []  # type: List[Tuple[str, bytes, int]]
+    frontier = [("", board)]
+    for _ in range(split_depth):
+        next_frontier = []
+        for root_move, position in frontier:
+            for move in gen_legal_moves(position, position.turn):
+                next_frontier.append((root_move or move_to_uci(move), gen_successor_from_move(position, move)))
+        frontier = next_frontier
+    for root_move, position in frontier:
+        tasks.append((root_move, board_to_bytes(position), depth - split_depth))
+    return tasks
+
+
+def parallel_divide(board: Board, depth: int, workers: Optional[int] = None,
+                    split_depth: Optional[int] = None) -> Dict[str, int]:
+    """Same as divide, with the subtrees counted by a pool of worker processes.
+    :param workers: number of processes, by default the number of CPUs
+    :param split_depth: how many plies below the root the tree is split. By default 2 for deep searches,
+        so that there are enough subtrees to balance the load, and 1 otherwise"""
+    if split_depth is None:
+        split_depth = (2 if depth >= 4 else 1)
+    split_depth = min(split_depth, depth)
+    if split_depth == 0:
+        return {}
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tasks = _split(board, depth, split_depth)
+    # a root move whose subtree ends before the split depth has no task, and counts 0 as in divide
+    counts = dict((move_to_uci(move), 0) for move in gen_legal_moves(board, board.turn))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # subtrees are small and many, so hand them out in batches
+        chunksize = max(1, len(tasks) // (4 * workers))
+        results = executor.map(_perft_task, [(data, remaining) for _, data, remaining in tasks],
+                               chunksize=chunksize)
+        for (root_move, _, _), nodes in zip(tasks, results):
+            counts[root_move] += nodes
+    return counts
+
+
+def parallel_perft(board: Board, depth: int, workers: Optional[int] = None,
+                   split_depth: Optional[int] = None) -> int:
+    """Same as perft, with the subtrees counted by a pool of worker processes"""
+    if depth == 0:
+        return 1
+    return sum(parallel_divide(board, depth, workers, split_depth).values())
+
+
+def format_result(nodes: int, elapsed: float) -> str:
+    nps = (nodes / elapsed if elapsed > 0 else 0.0)
+    return "nodes=%d time=%.3fs nps=%d" % (nodes, elapsed, nps)
+
+
+def run_perft(fen: str, depth: int, show_divide: bool = False, workers: int = 1) -> Tuple[int, float]:
+    """Run perft on the position and print the node count, time and nodes per second.
+    Return (nodes, elapsed seconds)
+    :param workers: number of processes. More than one uses parallel_perft"""
+    board = fen_to_board(fen)
+    start = time.perf_counter()
+    if show_divide:
+        if workers > 1:
+            counts = parallel_divide(board, depth, workers)
+        else:
+            counts = divide(board, depth)
+        elapsed = time.perf_counter() - start
+        for move in sorted(counts):
+            print("%s: %d" % (move, counts[move]))
+        nodes = sum(counts.values())
+    else:
+        if workers > 1:
+            nodes = parallel_perft(board, depth, workers)
+        else:
+            nodes = perft(board, depth)
+        elapsed = time.perf_counter() - start
+    print(format_result(nodes, elapsed))
+    return nodes, elapsed
+
+
+def run_suite(max_depth: int = 3, workers: int = 1) -> List[str]:
+    """Run every position of PERFT_SUITE up to max_depth, printing one line per position.
+    Return the names of the positions whose counts do not match"""
+    failed = []  # type: List[str]
+    total_nodes = 0
+    total_elapsed = 0.0
+    for name, fen, expected in PERFT_SUITE:
+        depth = min(max_depth, len(expected))
+        board = fen_to_board(fen)
+        start = time.perf_counter()
+        if workers > 1:
+            nodes = parallel_perft(board, depth, workers)
+        else:
+            nodes = perft(board, depth)
+        elapsed = time.perf_counter() - start
+        total_nodes += nodes
+        total_elapsed += elapsed
+        ok = nodes == expected[depth - 1]
+        if not ok:
+            failed.append(name)
+        print("%-12s depth=%d %s %s" % (name, depth, format_result(nodes, elapsed),
+                                        ("ok" if ok else "FAILED, expected %d" % expected[depth - 1])))
+    print("total %s" % format_result(total_nodes, total_elapsed))
+    return failed
@@ -0,0 +1,221 @@
+"""
+Depth-first proof-number search (df-pn) for mate problems.
+
+Alpha-beta has to look at every reply to every move down to the full depth, even when only a few lines can
+mate. Proof-number search instead grows the tree where it is cheapest to settle the question "can the
+attacker mate within n moves?". Every node has a proof number (how many leaves still have to be shown to be
+mates to prove it) and a disproof number (how many leaves have to be shown not to be mates to disprove it),
+and the search always expands the most-proving node. Forcing lines, where the defender has few replies,
+are therefore searched first and deepest.
+
+df-pn is the depth-first form: each node is searched while its numbers stay below thresholds given by its
+parent, and the numbers are kept in a table keyed by position and remaining depth rather than in an
+explicit tree. The table has a fixed cap; when it is full, the entries which took the least work to compute
+are dropped.
+
+Numbers are stored from the point of view of the side to move (phi and delta): at attacker nodes phi is the
+proof number and delta the disproof number, at defender nodes the other way around. phi == 0 means the
+side to move gets what it wants: a mate for the attacker, no mate for the defender.
+"""
+from typing import List, Optional, Tuple
+
+from .core.board import Board, Color
+from .core.move import Move
+from .core.piece_movement_rules import (_has_no_legal_moves, gen_checking_moves,
+                                        gen_legal_moves, is_in_check)
+
+INF = 1 << 30
+# estimate of the memory used by one table entry: the key tuple, the value tuple and the dict slot
+ENTRY_BYTES = 200
+DEFAULT_TABLE_MB = 64
+
+# phi, delta, nodes spent on the entry, and for proven mates the length in plies of the longest line of the proof
+TableEntry = Tuple[int, int, int, int]
+
+
+class NodeLimitReached(Exception):
+    """Raised inside the solver when the node budget runs out"""
+
+
+class DfpnSolver(object):
+    def __init__(self, size_mb: float = DEFAULT_TABLE_MB, max_nodes: Optional[int] = None):
+        """
+        :param size_mb: memory cap of the node table
+        :param max_nodes: give up after visiting this many nodes
+        """
+        self.max_entries = max(1024, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        self.max_nodes = max_nodes
+        # TableEntry keyed by (hash, plies left)
+        self.table = {}  # type: dict
+        self.nodes = 0
+        # nodes found to be a mate for the attacker, or not
+        self.proof_nodes = 0
+        self.disproof_nodes = 0
+        self.collections = 0
+        self.attacker = True  # type: Color
+
+    def solve(self, board: Board, color: Color, plies: int) -> Tuple[Optional[bool], List[Move]]:
+        """Can color mate within the given number of plies (2n - 1 for a mate in n)?
+        Return (True, mating line) if so, (False, []) if not, and (None, []) if the node budget ran out"""
+        self.attacker = color
+        try:
+            self._mid(board, color, plies, INF, INF)
+        except NodeLimitReached:
+            return None, []
+        phi, _, _, _ = self.table[(board.hash, plies)]
+        if phi != 0:
+            return False, []
+        return True, self._mating_line(board, color, plies)
+
+    def _entry(self, key: Tuple[int, int]) -> TableEntry:
+        return self.table.get(key, (1, 1, 0, 0))
+
+    def _store(self, key: Tuple[int, int], phi: int, delta: int, work: int, distance: int = 0) -> None:
+        if key not in self.table and len(self.table) >= self.max_entries:
+            self._collect()
+        self.table[key] = (phi, delta, work, distance)
+
+    def _collect(self) -> None:
+        """Drop the half of the table which took the least work to compute"""
+        self.collections += 1
+        entries = sorted(self.table.items(), key=lambda item: item[1][2])
+        self.table = dict(entries[len(entries) // 2:])
+
+    def _mate_in_one(self, board: Board, color: Color) -> Optional[Move]:
+        """The first move which checkmates, if any"""
+        for move in gen_checking_moves(board, color):
+            board.make_move(move)
+            mate = _has_no_legal_moves(board, not color)
+            board.unmake_move()
+            if mate:
+                return move
+        return None
+
+    def _mid(self, board: Board, color: Color, plies: int, th_phi: int, th_delta: int) -> None:
+        """Search the node until its phi or delta reaches the threshold, and store the result"""
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise NodeLimitReached()
+        start_nodes = self.nodes
+        key = (board.hash, plies)
+        phi, delta, work, _ = self._entry(key)
+        if phi >= th_phi or delta >= th_delta:
+            return
+
+        moves = list(gen_legal_moves(board, color))
+        if not moves or plies == 0:
+            # checkmate is a loss for the side to move. Stalemate, or running out of plies, is a loss
+            # for the attacker
+            if color == self.attacker or (not moves and is_in_check(board, color)):
+                phi, delta = INF, 0
+            else:
+                phi, delta = 0, INF
+            self._record(color, phi, delta)
+            self._store(key, phi, delta, work + 1)
+            return
+        if plies == 1 and color == self.attacker:
+            # the children are all leaves, so they are checked here rather than searched
+            if self._mate_in_one(board, color) is not None:
+                phi, delta, distance = 0, INF, 1
+            else:
+                phi, delta, distance = INF, 0, 0
+            self._record(color, phi, delta)
+            self._store(key, phi, delta, work + 1, distance)
+            return
+
+        child_keys = []  # type: List[Tuple[int, int]]
+        for move in moves:
+            board.make_move(move)
+            child_keys.append((board.hash, plies - 1))
+            board.unmake_move()
+
+        while True:
+            # phi is the smallest delta of the children, delta is the sum of their phi
+            best = 0
+            best_phi = 0
+            min_delta = INF
+            second_delta = INF
+            sum_phi = 0
+            for i, child_key in enumerate(child_keys):
+                child_phi, child_delta, _, _ = self._entry(child_key)
+                sum_phi += child_phi
+                if child_delta < min_delta:
+                    second_delta = min_delta
+                    min_delta = child_delta
+                    best = i
+                    best_phi = child_phi
+                elif child_delta < second_delta:
+                    second_delta = child_delta
+            phi = min_delta
+            delta = min(sum_phi, INF)
+            if phi >= th_phi or delta >= th_delta:
+                break
+            child_th_phi = th_delta + best_phi - delta
+            child_th_delta = min(th_phi, second_delta + 1)
+            board.make_move(moves[best])
+            try:
+                self._mid(board, not color, plies - 1, child_th_phi, child_th_delta)
+            finally:
+                board.unmake_move()
+
+        distance = 0
+        if phi == 0 or delta == 0:
+            self._record(color, phi, delta)
+            distance = self._mate_distance(color, phi, child_keys)
+        self._store(key, phi, delta, work + self.nodes - start_nodes + 1, distance)
+
+    def _mate_distance(self, color: Color, phi: int, child_keys: List[Tuple[int, int]]) -> int:
+        """Length of the proof below a settled node, if it is a mate: the shortest proven move for the
+        attacker, the longest reply for the defender"""
+        if (phi == 0) != (color == self.attacker):
+            return 0
+        if color == self.attacker:
+            # the children are defender nodes, mated when their delta is 0
+            return 1 + min(distance for _, delta, _, distance in map(self._entry, child_keys) if delta == 0)
+        return 1 + max(distance for _, _, _, distance in map(self._entry, child_keys))
+
+    def _record(self, color: Color, phi: int, delta: int) -> None:
+        # phi == 0 is a win for the side to move
+        if (phi == 0) == (color == self.attacker):
+            self.proof_nodes += 1
+        else:
+            self.disproof_nodes += 1
+
+    def _mating_line(self, board: Board, color: Color, plies: int) -> List[Move]:
+        """Follow the proof from a proven node: the attacker plays the move with the shortest proven mate, and
+        the defender the reply which delays the mate the longest. The board is left unchanged"""
+        line = []  # type: List[Move]
+        while plies > 0:
+            if plies == 1 and color == self.attacker:
+                mate = self._mate_in_one(board, color)
+                if mate is not None:
+                    line.append(mate)
+                    board.make_move(mate)
+                break
+            chosen = None  # type: Optional[Move]
+            chosen_distance = -1
+            for move in gen_legal_moves(board, color):
+                board.make_move(move)
+                key = (board.hash, plies - 1)
+                if key not in self.table and color != self.attacker:
+                    # every reply is part of the proof, so this one was dropped by a collection. Prove it again
+                    self._mid(board, not color, plies - 1, INF, INF)
+                _, child_delta, _, child_distance = self._entry(key)
+                board.unmake_move()
+                if color == self.attacker:
+                    if child_delta == 0 and (chosen is None or child_distance < chosen_distance):
+                        chosen = move
+                        chosen_distance = child_distance
+                elif child_distance > chosen_distance:
+                    chosen = move
+                    chosen_distance = child_distance
+            if chosen is None:
+                # checkmate
+                break
+            line.append(chosen)
+            board.make_move(chosen)
+            color = not color
+            plies -= 1
+        for _ in line:
+            board.unmake_move()
+        return line
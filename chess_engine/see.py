@@ -0,0 +1,104 @@
+"""
+Static exchange evaluation (SEE): the material won or lost by the sequence of captures on one square which a
+move starts. Both sides recapture with their least valuable attacker, and either side may stop capturing when
+going on would lose material.
+The exchange is played out on the board squares without making any move: captured attackers are only marked as
+removed, which uncovers the sliders behind them. Pins are not taken into account.
+"""
+from typing import List, Set
+
+from .core.board import (BISHOP_CODE, COLOR_MASK, EMPTY, KING_CODE,
+                         KNIGHT_CODE, NAME_TO_CODE, PAWN_CODE, QUEEN_CODE,
+                         ROOK_CODE, TYPE_MASK, WHITE_FLAG, Board)
+from .core.move import Move
+from .core.move_tables import (BISHOP_RAYS, KING_TARGETS, KNIGHT_TARGETS,
+                               PAWN_ATTACKS, ROOK_RAYS)
+from .core.pst import MG_MATERIAL
+
+# values in centipawns, indexed by the type bits of the piece code. The king is worth more than everything else
+# together, so that it only takes part in an exchange as the last capture
+SEE_VALUES = MG_MATERIAL[:KING_CODE] + (20000,) + MG_MATERIAL[KING_CODE + 1:]
+
+
+def _first_pieces(squares, rays, removed: Set[int]) -> List[int]:
+    """The first piece on each ray, skipping removed squares"""
+    found = []
+    for ray in rays:
+        for sq in ray:
+            if squares[sq] != EMPTY and sq not in removed:
+                found.append(sq)
+                break
+    return found
+
+
+def least_valuable_attacker(board: Board, target: int, flag: int, removed: Set[int]) -> int:
+    """Square of the least valuable piece of the color flag attacking target, or -1 if there is none.
+    Pieces on removed squares are ignored, and do not block sliding pieces"""
+    squares = board._board
+    pawn = PAWN_CODE | flag
+    for sq in PAWN_ATTACKS[flag != WHITE_FLAG][target]:
+        if squares[sq] == pawn and sq not in removed:
+            return sq
+    knight = KNIGHT_CODE | flag
+    for sq in KNIGHT_TARGETS[target]:
+        if squares[sq] == knight and sq not in removed:
+            return sq
+    diagonal = _first_pieces(squares, BISHOP_RAYS[target], removed)
+    bishop = BISHOP_CODE | flag
+    for sq in diagonal:
+        if squares[sq] == bishop:
+            return sq
+    straight = _first_pieces(squares, ROOK_RAYS[target], removed)
+    rook = ROOK_CODE | flag
+    for sq in straight:
+        if squares[sq] == rook:
+            return sq
+    queen = QUEEN_CODE | flag
+    for sq in diagonal + straight:
+        if squares[sq] == queen:
+            return sq
+    king = KING_CODE | flag
+    for sq in KING_TARGETS[target]:
+        if squares[sq] == king and sq not in removed:
+            return sq
+    return -1
+
+
+def see(board: Board, move: Move) -> int:
+    """Material balance in centipawns for the side making the move, once the exchanges on its destination are over.
+    Negative for a losing capture. Also works for quiet moves, which lose the piece if it is left hanging"""
+    squares = board._board
+    target = move.dest
+    piece = squares[move.src]
+    removed = {move.src}
+    if move.is_en_passant:
+        gain = SEE_VALUES[PAWN_CODE]
+        # the captured pawn is next to the source square, on the same row
+        removed.add(target + (10 if piece & WHITE_FLAG else -10))
+    else:
+        gain = SEE_VALUES[squares[target] & TYPE_MASK]
+    on_target = SEE_VALUES[piece & TYPE_MASK]
+    if move.promotion:
+        on_target = SEE_VALUES[NAME_TO_CODE[move.promotion] & TYPE_MASK]
+        gain += on_target - SEE_VALUES[PAWN_CODE]
+
+    # gains[i] is the balance for the side making capture i if the exchange stops after it
+    gains = [gain]
+    side = (piece & COLOR_MASK) ^ COLOR_MASK
+    while True:
+        attacker = least_valuable_attacker(board, target, side, removed)
+        if attacker == -1:
+            break
+        if squares[attacker] & TYPE_MASK == KING_CODE:
+            # the king may only capture onto a square the other side no longer attacks
+            if least_valuable_attacker(board, target, side ^ COLOR_MASK, removed | {attacker}) != -1:
+                break
+        gains.append(on_target - gains[-1])
+        on_target = SEE_VALUES[squares[attacker] & TYPE_MASK]
+        removed.add(attacker)
+        side ^= COLOR_MASK
+
+    # each side only makes its capture if it does better than stopping before it
+    for i in range(len(gains) - 1, 0, -1):
+        gains[i - 1] = -1 * max(-1 * gains[i - 1], gains[i])
+    return gains[0]
@@ -0,0 +1,217 @@
+"""
+Lazy SMP: several processes search the same position by iterative deepening at the same time, sharing one
+transposition table in shared memory. They do not otherwise communicate. Each worker finds what the others
+stored and skips that part of the tree, and the helpers start one ply deeper than the main worker, so they
+fill the table ahead of it.
+The result comes from the worker with the deepest completed iteration. Once any worker is done, the others
+are told to stop and report their last completed iteration.
+
+Mate searches split the work at the root instead: every first move of the attacker is proven or refuted on
+its own, so parallel_mate_search hands the root moves to the pool in batches, best moves first, and stops
+every worker as soon as one of them proves a mate.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Tuple
+
+from .core.board import Board, Color, board_to_bytes, bytes_to_board
+from .core.move import Move, decode_move, encode_move
+from .core.piece_movement_rules import gen_checking_moves, gen_legal_moves
+from .engine import (CHECKMATE, MATE_THRESHOLD, MAX_PLY, SearchAborted,
+                     SearchContext, negamax, search)
+from .ordering import MoveOrdering, pick_best
+from .stats import SearchStats
+from .transposition import DEFAULT_SIZE_MB, SharedTranspositionTable
+
+# (completed depth, score, packed moves of the best line, counters of the search)
+WorkerResult = Tuple[int, int, List[int], SearchStats]
+
+
+def _decode_line(board: Board, packed_moves: List[int]) -> List[Move]:
+    """Moves of a line packed with encode_move. The board is left unchanged"""
+    moves = []  # type: List[Move]
+    for packed in packed_moves:
+        move = decode_move(board, packed)
+        moves.append(move)
+        board.make_move(move)
+    for _ in moves:
+        board.unmake_move()
+    return moves
+
+
+def _smp_worker(task: tuple) -> WorkerResult:
+    """Run in a worker process"""
+    data, color, worker_index, table_name, size_mb, stop_name, time_ms, nodes, max_depth = task
+    board = bytes_to_board(data)
+    tt = SharedTranspositionTable(size_mb, name=table_name)
+    stop = SharedMemory(name=stop_name)
+    stats = SearchStats()
+    try:
+        score, moves = search(board, color, time_ms, nodes, max_depth, tt=tt, stats=stats,
+                              start_depth=1 + worker_index % 2,
+                              should_stop=lambda: stop.buf[0] != 0)
+        stop.buf[0] = 1
+    finally:
+        tt.close()
+        stop.close()
+    return stats.depth, score, [encode_move(move) for move in moves], stats
+
+
+def smp_search(board: Board, color: Color, workers: Optional[int] = None, time_ms: Optional[float] = None,
+               nodes: Optional[int] = None, max_depth: int = MAX_PLY, size_mb: float = DEFAULT_SIZE_MB,
+               stats: Optional[SearchStats] = None) -> Tuple[int, List[Move]]:
+    """Same as engine.search, with the work shared by several processes.
+    :param workers: number of processes, by default the number of CPUs
+    :param nodes: node budget of each worker
+    :param size_mb: size of the shared transposition table
+    :param stats: gets the counters of all the workers added together, the iterations of the worker the result
+        comes from, and the depth reached by each worker"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    start = time.perf_counter()
+    data = board_to_bytes(board)
+    tt = SharedTranspositionTable(size_mb)
+    stop = SharedMemory(create=True, size=1)
+    stop.buf[0] = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_smp_worker, (data, color, i, tt.name, size_mb, stop.name, time_ms, nodes, max_depth))
+                for i in range(workers)
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        tt.close()
+        tt.unlink()
+        stop.close()
+        stop.unlink()
+
+    # the deepest completed iteration, preferring the main worker on ties
+    best = max(range(workers), key=lambda i: (results[i][0], -i))
+    _, score, packed_moves, best_stats = results[best]
+    moves = _decode_line(board, packed_moves)
+
+    if stats is not None:
+        total = SearchStats()
+        for _, _, _, worker_stats in results:
+            total.merge(worker_stats)
+        total.iterations = best_stats.iterations
+        total.elapsed = time.perf_counter() - start
+        total.worker_depths = [result[0] for result in results]
+        stats.merge(total)
+        stats.worker_depths = total.worker_depths
+    return score, moves
+
+
+# (index of the root move in the search order, score for the attacker, packed moves of the line)
+RootResult = Tuple[int, int, List[int]]
+
+
+def _mate_worker(task: tuple) -> Tuple[List[RootResult], SearchStats]:
+    """Run in a worker process. Search each root move of the batch until one of them mates.
+    Return the results of the moves searched to the end, and the counters of all the searches"""
+    data, color, batch, depth, table_name, size_mb, stop_name, checks_only = task
+    board = bytes_to_board(data)
+    tt = SharedTranspositionTable(size_mb, name=table_name)
+    stop = SharedMemory(name=stop_name)
+    results = []  # type: List[RootResult]
+    stats = SearchStats()
+    try:
+        for order, packed in batch:
+            if stop.buf[0]:
+                break
+            ctx = SearchContext(tt, mate_search=True, should_stop=lambda: stop.buf[0] != 0,
+                                checks_only=checks_only)
+            # a root move is either searched to the end or not reported at all
+            ctx.allow_abort()
+            board.make_move(decode_move(board, packed))
+            try:
+                score = -1 * negamax(board, depth - 1, 1, -1 * CHECKMATE - 1, CHECKMATE + 1, not color, ctx)
+            except SearchAborted:
+                break
+            finally:
+                board.unmake_move()
+                stats.merge(ctx.stats)
+            line = [packed] + [encode_move(move) for move in ctx.pv[1][1:ctx.pv_length[1]]]
+            results.append((order, score, line))
+            if score >= MATE_THRESHOLD:
+                stop.buf[0] = 1
+                break
+    finally:
+        tt.close()
+        stop.close()
+    return results, stats
+
+
+def parallel_mate_search(board: Board, color: Color, depth: int, workers: Optional[int] = None,
+                         size_mb: float = DEFAULT_SIZE_MB, stats: Optional[SearchStats] = None,
+                         checks_only: bool = False) -> Tuple[int, List[Move]]:
+    """Mate search of the given depth in plies, with the root moves split across a pool of worker processes.
+    Return the score from the point of view of color and the best line, like the serial search.
+    The first mate proven is returned, which may not be the shortest one.
+    :param workers: number of processes, by default the number of CPUs
+    :param size_mb: size of the transposition table shared by the workers
+    :param stats: gets the counters of all the workers added together
+    :param checks_only: only look for mates where every attacker move is a check"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if checks_only or depth == 1:
+        root_moves = list(gen_checking_moves(board, color))
+    else:
+        root_moves = list(gen_legal_moves(board, color))
+    if not root_moves:
+        # checkmate, stalemate or no checks: nothing to split
+        ctx = SearchContext(mate_search=True, checks_only=checks_only)
+        score = negamax(board, depth, 0, -1 * CHECKMATE - 1, CHECKMATE + 1, color, ctx)
+        if stats is not None:
+            stats.merge(ctx.stats)
+        return score, []
+    scores = MoveOrdering(use_see=False).score_moves(board, root_moves, 0)
+    ordered = [encode_move(move) for move in pick_best(root_moves, scores)]
+
+    # each root move is a large search, so the batches are small. They are submitted best moves first,
+    # and the pool starts them in that order
+    batch_size = max(1, len(ordered) // (4 * workers))
+    batches = [list(enumerate(ordered))[i:i + batch_size] for i in range(0, len(ordered), batch_size)]
+
+    start = time.perf_counter()
+    data = board_to_bytes(board)
+    tt = SharedTranspositionTable(size_mb)
+    stop = SharedMemory(create=True, size=1)
+    stop.buf[0] = 0
+    results = []  # type: List[RootResult]
+    total = SearchStats()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set(
+                executor.submit(_mate_worker, (data, color, batch, depth, tt.name, size_mb, stop.name, checks_only))
+                for batch in batches
+            )
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    batch_results, batch_stats = future.result()
+                    results.extend(batch_results)
+                    total.merge(batch_stats)
+                if stop.buf[0]:
+                    # a mate is proven: drop the batches which have not started.
+                    # the running ones see the stop flag and return
+                    for future in pending:
+                        future.cancel()
+    finally:
+        tt.close()
+        tt.unlink()
+        stop.close()
+        stop.unlink()
+
+    if stats is not None:
+        total.elapsed = time.perf_counter() - start
+        total.depth = depth
+        stats.merge(total)
+    # the best score, preferring the move searched first on ties
+    _, score, packed_moves = max(results, key=lambda result: (result[1], -result[0]))
+    return score, _decode_line(board, packed_moves)
@@ -0,0 +1,146 @@
+"""
+Counters filled in by the searches, to see where the time of a search goes.
+
+A SearchStats object is passed to search, find_mate_in_n and the other searches, which add to its counters,
+so several searches can be totalled in one object. It can be exported as JSON, or as a single line of
+key=value pairs for log processing.
+"""
+import json
+from typing import Dict, List, Tuple
+
+# (depth, nodes searched by the iteration, seconds taken by the iteration)
+Iteration = Tuple[int, int, float]
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return ("true" if value else "false")
+    if isinstance(value, float):
+        return "%.3f" % value
+    if isinstance(value, list):
+        return ",".join(_format_value(item) for item in value)
+    return str(value)
+
+
+class SearchStats(object):
+    __slots__ = ("nodes", "qnodes", "tt_probes", "tt_hits", "beta_cutoffs", "first_move_cutoffs",
+                 "null_cutoffs", "lmr_researches", "pvs_researches", "aspiration_researches",
+                 "depth", "elapsed", "iterations", "worker_depths")
+
+    def __init__(self):
+        # every node visited, including the quiescence nodes
+        self.nodes = 0
+        self.qnodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        # cutoffs after searching a move in the main search, and how many of those came from the first move
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        # null-move searches which caused a cutoff, reduced moves searched again at full depth, moves searched
+        # again with the full window after beating alpha in a zero window, and root searches repeated after
+        # falling outside the aspiration window
+        self.null_cutoffs = 0
+        self.lmr_researches = 0
+        self.pvs_researches = 0
+        self.aspiration_researches = 0
+        # deepest completed iteration
+        self.depth = 0
+        # wall-clock seconds
+        self.elapsed = 0.0
+        self.iterations = []  # type: List[Iteration]
+        # deepest completed iteration of each process, in parallel searches
+        self.worker_depths = []  # type: List[int]
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        """Share of the cutoffs caused by the first move searched. Close to 1 when the move ordering is good"""
+        return (self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0)
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return (self.tt_hits / self.tt_probes if self.tt_probes else 0.0)
+
+    @property
+    def nps(self) -> float:
+        """Nodes per second"""
+        return (self.nodes / self.elapsed if self.elapsed > 0 else 0.0)
+
+    def record_iteration(self, depth: int, nodes: int, elapsed: float) -> None:
+        """Called by iterative deepening once an iteration is completed"""
+        self.iterations.append((depth, nodes, elapsed))
+        self.depth = depth
+
+    def branching_factors(self) -> Dict[int, float]:
+        """Effective branching factor at each depth after the first: the nodes of the iteration over the nodes
+        of the previous one"""
+        factors = {}  # type: Dict[int, float]
+        for (_, prev_nodes, _), (depth, nodes, _) in zip(self.iterations, self.iterations[1:]):
+            factors[depth] = (nodes / prev_nodes if prev_nodes else 0.0)
+        return factors
+
+    def merge(self, other: "SearchStats") -> None:
+        """Add the counters, time and iterations of another search to these"""
+        for name in _counter_slots(type(self)):
+            if hasattr(other, name):
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.depth = max(self.depth, other.depth)
+        self.iterations.extend(other.iterations)
+
+    def to_dict(self) -> dict:
+        data = dict((name, getattr(self, name)) for name in _all_slots(type(self)) if name != "iterations")
+        data["first_move_cutoff_rate"] = self.first_move_cutoff_rate
+        data["tt_hit_rate"] = self.tt_hit_rate
+        data["nps"] = self.nps
+        factors = self.branching_factors()
+        data["iterations"] = [
+            {"depth": depth, "nodes": nodes, "time": elapsed, "branching_factor": factors.get(depth)}
+            for depth, nodes, elapsed in self.iterations
+        ]
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    def to_log_line(self) -> str:
+        """A single line of key=value pairs. Each iteration adds depth<n>_nodes, depth<n>_time and,
+        after the first, depth<n>_bf"""
+        data = self.to_dict()
+        pairs = ["%s=%s" % (name, _format_value(data[name])) for name in sorted(data) if name != "iterations"]
+        for iteration in data["iterations"]:
+            prefix = "depth%d_" % iteration["depth"]
+            pairs.append("%snodes=%d" % (prefix, iteration["nodes"]))
+            pairs.append("%stime=%.3f" % (prefix, iteration["time"]))
+            if iteration["branching_factor"] is not None:
+                pairs.append("%sbf=%.2f" % (prefix, iteration["branching_factor"]))
+        return " ".join(pairs)
+
+    def __repr__(self) -> str:
+        return "SearchStats(%s)" % self.to_log_line()
+
+
+class ProofNumberStats(SearchStats):
+    __slots__ = ("proof_nodes", "disproof_nodes", "table_entries", "table_collections", "solved")
+
+    def __init__(self):
+        """SearchStats of a proof-number search (find_mate_in_n_pns), which does not deepen iteratively or
+        cut off, along with the number of nodes proven and disproven and the size of its table"""
+        super(ProofNumberStats, self).__init__()
+        self.proof_nodes = 0
+        self.disproof_nodes = 0
+        self.table_entries = 0
+        self.table_collections = 0
+        # False if the node budget ran out before the question was settled
+        self.solved = False
+
+
+def _all_slots(cls) -> List[str]:
+    names = []  # type: List[str]
+    for klass in reversed(cls.__mro__):
+        names.extend(getattr(klass, "__slots__", ()))
+    return names
+
+
+def _counter_slots(cls) -> List[str]:
+    """The slots which are totals, added together by merge"""
+    return [name for name in _all_slots(cls)
+            if name not in ("depth", "iterations", "worker_depths", "table_entries", "solved")]
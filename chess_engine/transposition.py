@@ -0,0 +1,192 @@
+"""
+Transposition table for the search, keyed by the Zobrist hash of the board.
+
+Entries live in two parallel arrays of unsigned 64-bit integers: one for the keys and one for packed data.
+The table is split into buckets of two entries. The first entry of a bucket is depth-preferred: it is only
+replaced by a search at least as deep, or by any search from a newer generation. The second entry is always
+replaced.
+
+The key slot holds the key xor-ed with the data. An entry is only used if the two words still xor back to
+the key being probed, so a key and data pair which was torn by a concurrent write from another process is
+treated as a miss. This lets SharedTranspositionTable be shared between processes without any locking.
+"""
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Tuple
+
+# bound types
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+ENTRY_BYTES = 16
+DEFAULT_SIZE_MB = 16
+
+# layout of the packed data word
+_MOVE_BITS = 20
+_SCORE_BITS = 24
+_DEPTH_BITS = 8
+_BOUND_BITS = 2
+_SCORE_SHIFT = _MOVE_BITS
+_DEPTH_SHIFT = _SCORE_SHIFT + _SCORE_BITS
+_BOUND_SHIFT = _DEPTH_SHIFT + _DEPTH_BITS
+_GENERATION_SHIFT = _BOUND_SHIFT + _BOUND_BITS
+_MOVE_MASK = (1 << _MOVE_BITS) - 1
+_SCORE_MASK = (1 << _SCORE_BITS) - 1
+_SCORE_OFFSET = 1 << (_SCORE_BITS - 1)
+_DEPTH_MASK = (1 << _DEPTH_BITS) - 1
+_BOUND_MASK = (1 << _BOUND_BITS) - 1
+_GENERATION_MASK = 0xff
+
+# (depth, score, bound, packed move)
+Entry = Tuple[int, int, int, int]
+
+
+def pack_entry(depth: int, score: int, bound: int, move: int, generation: int) -> int:
+    return (move |
+            ((score + _SCORE_OFFSET) << _SCORE_SHIFT) |
+            (depth << _DEPTH_SHIFT) |
+            (bound << _BOUND_SHIFT) |
+            (generation << _GENERATION_SHIFT))
+
+
+def unpack_entry(data: int) -> Entry:
+    return (
+        (data >> _DEPTH_SHIFT) & _DEPTH_MASK,
+        ((data >> _SCORE_SHIFT) & _SCORE_MASK) - _SCORE_OFFSET,
+        (data >> _BOUND_SHIFT) & _BOUND_MASK,
+        data & _MOVE_MASK,
+    )
+
+
+def _num_buckets(size_mb: float) -> int:
+    """Largest power of two number of buckets which fits in size_mb megabytes"""
+    num_buckets = 1
+    while num_buckets * 4 * ENTRY_BYTES <= size_mb * 1024 * 1024:
+        num_buckets *= 2
+    return num_buckets
+
+
+class TranspositionTable:
+    def __init__(self, size_mb: float = DEFAULT_SIZE_MB):
+        """
+        Allocate a table using at most size_mb megabytes.
+        The number of buckets is rounded down to a power of two
+        """
+        num_buckets = _num_buckets(size_mb)
+        self._mask = num_buckets - 1
+        self._keys = array("Q", [0]) * (num_buckets * 2)
+        self._data = array("Q", [0]) * (num_buckets * 2)
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def __len__(self) -> int:
+        """Number of entries (not buckets) the table can hold"""
+        return len(self._keys)
+
+    def new_search(self) -> None:
+        """Age the existing entries, so that the depth-preferred slots can be reused by the next search"""
+        self._generation = (self._generation + 1) & _GENERATION_MASK
+
+    def clear(self) -> None:
+        size = len(self._keys)
+        for i in range(size):
+            self._keys[i] = 0
+            self._data[i] = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def probe(self, key: int) -> Optional[Entry]:
+        """Return (depth, score, bound, packed move) for this position, or None"""
+        i = (key & self._mask) << 1
+        keys = self._keys
+        data = self._data
+        # read each data word once, so the check and the result are from the same write
+        entry = data[i]
+        if keys[i] ^ entry == key:
+            self.hits += 1
+            return unpack_entry(entry)
+        entry = data[i + 1]
+        if keys[i + 1] ^ entry == key:
+            self.hits += 1
+            return unpack_entry(entry)
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: int = 0) -> None:
+        """Store the search result for this position.
+        :param move: the best move packed with encode_move, or 0 if there is none"""
+        i = (key & self._mask) << 1
+        keys = self._keys
+        data = self._data
+        old = data[i]
+        first_key = keys[i] ^ old
+        second = data[i + 1]
+        second_key = keys[i + 1] ^ second
+        if move == 0:
+            # keep the best move found by an earlier search of this position
+            if first_key == key:
+                move = old & _MOVE_MASK
+            elif second_key == key:
+                move = second & _MOVE_MASK
+        packed = pack_entry(depth, score, bound, move, self._generation)
+
+        if (first_key == key or first_key == 0 or
+                depth >= (old >> _DEPTH_SHIFT) & _DEPTH_MASK or
+                (old >> _GENERATION_SHIFT) & _GENERATION_MASK != self._generation):
+            slot = i
+            stored_key = first_key
+        else:
+            slot = i + 1
+            stored_key = second_key
+        if stored_key != 0 and stored_key != key:
+            self.collisions += 1
+        keys[slot] = key ^ packed
+        data[slot] = packed
+
+
+class SharedTranspositionTable(TranspositionTable):
+    def __init__(self, size_mb: float = DEFAULT_SIZE_MB, name: Optional[str] = None):
+        """
+        Transposition table in shared memory, which other processes can attach to by name.
+        The process which creates the table (name is None) must unlink it once every process has closed it.
+        Each process keeps its own counters and generation
+        :param name: name of an existing table to attach to. size_mb must be the same as when it was created
+        """
+        num_buckets = _num_buckets(size_mb)
+        self._mask = num_buckets - 1
+        size = num_buckets * 2 * ENTRY_BYTES
+        if name is None:
+            self._shm = SharedMemory(create=True, size=size)
+            # the memory is zeroed on creation, so every slot is empty
+        else:
+            self._shm = SharedMemory(name=name)
+        self.size_mb = size_mb
+        # the first half of the buffer holds the keys, the second half the data
+        self._view = self._shm.buf[:size].cast("Q")
+        self._keys = self._view[:num_buckets * 2]
+        self._data = self._view[num_buckets * 2:]
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def close(self) -> None:
+        """Detach this process from the table"""
+        self._keys.release()
+        self._data.release()
+        self._view.release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory. Called once, by the process which created the table"""
+        self._shm.unlink()
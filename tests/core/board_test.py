@@ -1,6 +1,16 @@
-from chess_engine.core.board import (WHITE, Board, dump_board, get_piece_list,
-                                     index_to_sq, is_valid_square, load_board,
-                                     sq_to_index, starter_board)
+import pytest
+
+from chess_engine.core.board import (ALL_CASTLING, BLACK, BLACK_FLAG,
+                                     CASTLE_BLACK_KING, CASTLE_WHITE_KING,
+                                     CASTLE_WHITE_QUEEN, KING_CODE, ROOK_CODE,
+                                     WHITE, WHITE_FLAG, Board, dump_board,
+                                     fen_to_board, find_king_index,
+                                     get_code_list, get_color,
+                                     get_color_flag, get_piece_list,
+                                     get_raw_code, index_to_sq,
+                                     is_valid_square, load_board, sq_to_index,
+                                     starter_board)
+from chess_engine.core.move import Move
 
 
 def test_sq_to_index():
@@ -91,3 +101,104 @@ def test_piece_list():
     pl = get_piece_list(board, WHITE)
     apl = [(index_to_sq(idx), piece) for idx, piece in pl]
     assert sorted(apl) == starter_piece_list
+
+
+def test_piece_codes():
+    board = Board()
+    a1 = sq_to_index("a1")
+    e8 = sq_to_index("e8")
+    assert board._board[a1] == ROOK_CODE | WHITE_FLAG
+    assert board._board[e8] == KING_CODE | BLACK_FLAG
+    assert get_raw_code(board._board[e8]) == KING_CODE
+    assert get_color(board, a1) == WHITE
+    assert get_color(board, e8) == BLACK
+    assert get_color(board, sq_to_index("e4")) is None
+    assert get_color_flag(board, a1) == WHITE_FLAG
+    assert get_color_flag(board, 0) == 0
+    # the string adapter
+    assert board[a1] == "R"
+    assert board[e8] == "k"
+    assert [piece for piece in board] == starter_board
+
+
+def test_code_list():
+    board = Board()
+    black_squares = [sq_to_index(col + row) for row in "87" for col in "abcdefgh"]
+    assert sorted(index for index, _ in get_code_list(board, BLACK)) == black_squares
+    assert all(code & WHITE_FLAG for _, code in get_code_list(board, WHITE))
+
+
+def test_make_unmake_move():
+    board = fen_to_board("r3k2r/1P6/8/3pP3/8/8/8/R3K2R w")
+    board._ep_index = sq_to_index("d6")
+    before = bytes(board._board)
+    moves = [
+        Move("P", sq_to_index("e5"), sq_to_index("d6"), is_capture=True, is_en_passant=True),
+        Move("K", sq_to_index("e1"), sq_to_index("g1"), is_castle=True),
+        Move("P", sq_to_index("b7"), sq_to_index("a8"), promotion="Q", is_capture=True),
+    ]
+    for move in moves:
+        board.make_move(move)
+        board.unmake_move()
+        assert bytes(board._board) == before
+        assert board.get_ep_capture_index() == sq_to_index("d6")
+        assert board.get_ep_pawn_index() == sq_to_index("d5")
+        assert board.can_castle(ALL_CASTLING)
+
+    board.make_move(moves[0])
+    assert board[sq_to_index("d5")] == "E"
+    assert not board.is_en_passant_possible()
+    board.make_move(moves[1])
+    assert board[sq_to_index("f1")] == "R"
+    assert not board.can_castle(CASTLE_WHITE_KING | CASTLE_WHITE_QUEEN)
+    assert board.can_castle(CASTLE_BLACK_KING)
+    board.unmake_move()
+    board.unmake_move()
+    assert bytes(board._board) == before
+
+
+def test_null_move():
+    board = fen_to_board("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1")
+    start_hash = board.hash
+    board.make_null_move()
+    assert board.turn == BLACK
+    assert not board.is_en_passant_possible()
+    assert board.hash == fen_to_board("4k3/8/8/3pP3/8/8/8/4K3 b - - 0 1").hash
+    board.unmake_move()
+    assert board.turn == WHITE
+    assert board.get_ep_capture_index() == sq_to_index("d6")
+    assert board.hash == start_hash
+
+
+def test_piece_list_follows_moves():
+    board = fen_to_board("4k3/1P6/8/8/8/8/8/4K3 w")
+    assert sorted(board._pieces[WHITE]) == [sq_to_index("b7"), sq_to_index("e1")]
+    board.make_move(Move("P", sq_to_index("b7"), sq_to_index("b8"), promotion="N"))
+    assert list(get_piece_list(board, WHITE)) == [(sq_to_index("b8"), "N"), (sq_to_index("e1"), "K")]
+    board.unmake_move()
+    assert list(get_piece_list(board, WHITE)) == [(sq_to_index("b7"), "P"), (sq_to_index("e1"), "K")]
+    assert list(get_piece_list(board, BLACK)) == [(sq_to_index("e8"), "k")]
+
+
+def test_find_king_index():
+    board = Board()
+    assert find_king_index(board, WHITE) == sq_to_index("e1")
+    assert find_king_index(board, BLACK) == sq_to_index("e8")
+    board.make_move(Move("K", sq_to_index("e1"), sq_to_index("g1"), is_castle=True))
+    assert find_king_index(board, WHITE) == sq_to_index("g1")
+    board.unmake_move()
+    assert find_king_index(board, WHITE) == sq_to_index("e1")
+
+    # the loaders refuse a board without both kings
+    with pytest.raises(ValueError, match="one black king, found 0"):
+        fen_to_board("8/8/8/8/8/8/8/R3K3 w")
+    with pytest.raises(ValueError, match="one white king, found 2"):
+        fen_to_board("4k3/8/8/8/8/8/8/R3K2K w")
+    with pytest.raises(ValueError, match="one white king"):
+        load_board([[""] * 7 + ["k"]] + [[""] * 8] * 7)
+    # a Board built directly is not checked, so find_king_index is where a missing king shows up
+    no_king = Board(fen_to_board("4k3/8/8/8/8/8/8/R3K3 w"))
+    no_king[sq_to_index("e8")] = "E"
+    assert find_king_index(no_king, WHITE) == sq_to_index("e1")
+    with pytest.raises(Exception, match="no black king"):
+        find_king_index(no_king, BLACK)
@@ -0,0 +1,36 @@
+from chess_engine.core.board import BLACK, WHITE, is_valid_square, sq_to_index
+from chess_engine.core.move_tables import (BISHOP_RAYS, DIRECTION_RAYS,
+                                           KING_TARGETS, KNIGHT_TARGETS,
+                                           PAWN_ATTACKS, QUEEN_RAYS,
+                                           ROOK_RAYS)
+
+
+def squares(*sqs):
+    return sorted(sq_to_index(sq) for sq in sqs)
+
+
+def test_knight_targets():
+    assert sorted(KNIGHT_TARGETS[sq_to_index("a1")]) == squares("b3", "c2")
+    assert len(KNIGHT_TARGETS[sq_to_index("d4")]) == 8
+    assert KNIGHT_TARGETS[0] == ()
+
+
+def test_king_targets():
+    assert sorted(KING_TARGETS[sq_to_index("h8")]) == squares("g8", "g7", "h7")
+    assert len(KING_TARGETS[sq_to_index("e4")]) == 8
+
+
+def test_rays():
+    a1 = sq_to_index("a1")
+    assert sum(len(ray) for ray in ROOK_RAYS[a1]) == 14
+    assert BISHOP_RAYS[a1] == (tuple(sq_to_index(sq) for sq in ["b2", "c3", "d4", "e5", "f6", "g7", "h8"]),)
+    assert sum(len(ray) for ray in QUEEN_RAYS[sq_to_index("d4")]) == 27
+    assert len(DIRECTION_RAYS[a1]) == 8
+    for rays in DIRECTION_RAYS:
+        for ray in rays:
+            assert all(is_valid_square(sq) for sq in ray)
+
+
+def test_pawn_attacks():
+    assert sorted(PAWN_ATTACKS[WHITE][sq_to_index("e4")]) == squares("d5", "f5")
+    assert sorted(PAWN_ATTACKS[BLACK][sq_to_index("a7")]) == squares("b6")
@@ -1,20 +1,27 @@
 import unittest as T
 
-from chess_engine.core.board import (dump_board, fen_to_board,
-                                load_board, print_board, sq_to_index,
-                                BLACK, WHITE, Board)
+from chess_engine.core.board import (BLACK, WHITE, Board, dump_board,
+                                     fen_to_board, index_to_sq, load_board,
+                                     print_board, sq_to_index)
 from chess_engine.core.move import gen_successor
-from chess_engine.core.piece_movement_rules import (_has_no_legal_moves,
-                                               get_bishop_valid_squares,
-                                               get_king_valid_squares,
-                                               get_knight_valid_squares,
-                                               get_pawn_valid_squares,
-                                               get_piece_valid_squares,
-                                               get_promotions,
-                                               get_queen_valid_squares,
-                                               get_rook_valid_squares,
-                                               is_in_check, is_in_checkmate,
-                                               is_in_stalemate, is_legal_move)
+from chess_engine.core.piece_movement_rules import (CAPTURES, QUIETS,
+                                                    _has_no_legal_moves,
+                                                    gen_checking_moves,
+                                                    gen_legal_squares,
+                                                    get_bishop_valid_squares,
+                                                    get_king_valid_squares,
+                                                    get_knight_valid_squares,
+                                                    get_pawn_valid_squares,
+                                                    get_piece_valid_squares,
+                                                    get_pins_and_checkers,
+                                                    get_promotions,
+                                                    get_queen_valid_squares,
+                                                    get_rook_valid_squares,
+                                                    is_in_check,
+                                                    is_in_checkmate,
+                                                    is_in_stalemate,
+                                                    is_legal_move,
+                                                    is_square_attacked)
 
 
 class PieceMovementTest(T.TestCase):
@@ -32,7 +39,7 @@ class PieceMovementTest(T.TestCase):
             ["", "", "", "", "", "", "", ""],
             ["", "", "", "", "", "", "", ""],
             ["", "", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", "", ""],
+            ["", "", "", "", "k", "", "", "K"],
         ])
         rook_squares = sorted([sq_to_index(sq) for sq in
                                ["a7", "b1", "b2", "b3", "b4", "b5", "b6", "b8",
@@ -48,7 +55,7 @@ class PieceMovementTest(T.TestCase):
             ["", "", "", "", "", "", "", ""],
             ["", "", "", "", "", "", "", ""],
             ["", "", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", "", ""],
+            ["", "", "", "", "k", "", "", "K"],
         ])
         rook_squares = sorted([sq_to_index(sq) for sq in ["a8", "b7", "c8", "d8"]])
         assert sorted(get_rook_valid_squares(board, sq_to_index("b8"))) == rook_squares
@@ -62,7 +69,7 @@ class PieceMovementTest(T.TestCase):
             ["", "", "", "", "", "", "", ""],
             ["", "", "", "", "", "", "", ""],
             ["", "", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", "", ""],
+            ["", "", "", "", "k", "", "", "K"],
         ])
         rook_squares = sorted([sq_to_index(sq) for sq in ["a8", "c8"]])
         assert sorted(get_rook_valid_squares(board, sq_to_index("b8"))) == rook_squares
@@ -230,6 +237,24 @@ class PieceMovementTest(T.TestCase):
 
 
 class CheckTest(T.TestCase):
+    def test_square_attacked(self):
+        board = fen_to_board("4k3/8/3p4/8/1b3N2/8/6P1/R3K3 w")
+        # knight
+        assert is_square_attacked(board, sq_to_index("e6"), WHITE)
+        assert is_square_attacked(board, sq_to_index("g2"), WHITE)
+        # pawns only attack diagonally forward
+        assert is_square_attacked(board, sq_to_index("f3"), WHITE)
+        assert not is_square_attacked(board, sq_to_index("g3"), WHITE)
+        assert is_square_attacked(board, sq_to_index("e5"), BLACK)
+        # sliders stop at the first blocker
+        assert is_square_attacked(board, sq_to_index("a8"), WHITE)
+        assert is_square_attacked(board, sq_to_index("d1"), WHITE)
+        assert not is_square_attacked(board, sq_to_index("h1"), WHITE)
+        assert is_square_attacked(board, sq_to_index("e1"), BLACK)
+        assert not is_square_attacked(board, sq_to_index("f8"), WHITE)
+        # king ring
+        assert is_square_attacked(board, sq_to_index("d7"), BLACK)
+
     def test_bishop_check(self):
         board = fen_to_board("7k/8/8/4B3/8/8/8/K7 w")
         assert is_in_check(board, BLACK)
@@ -397,3 +422,76 @@ class CheckTest(T.TestCase):
         assert not is_in_stalemate(board, BLACK)
         assert not is_in_stalemate(board, WHITE)
         assert not _has_no_legal_moves(board, BLACK)
+
+
+class LegalMoveTest(T.TestCase):
+    def legal_squares(self, board, color):
+        return sorted((index_to_sq(src), index_to_sq(dest)) for src, dest in gen_legal_squares(board, color))
+
+    def test_pinned_piece_moves_along_pin(self):
+        board = fen_to_board("4k3/8/8/8/4r3/8/4R3/4K3 w")
+        pins, checkers, _ = get_pins_and_checkers(board, WHITE)
+        assert checkers == []
+        assert set(pins) == {sq_to_index("e2")}
+        rook_moves = [dest for src, dest in self.legal_squares(board, WHITE) if src == "e2"]
+        assert rook_moves == ["e3", "e4"]
+
+    def test_pinned_knight_cannot_move(self):
+        board = fen_to_board("4k3/8/8/b7/8/8/3N4/4K3 w")
+        assert [src for src, _ in self.legal_squares(board, WHITE) if src == "d2"] == []
+
+    def test_check_evasions(self):
+        board = fen_to_board("4k3/8/8/8/4N2b/8/8/4K3 w")
+        pins, checkers, evasions = get_pins_and_checkers(board, WHITE)
+        assert checkers == [sq_to_index("h4")]
+        assert sorted(evasions) == sorted(sq_to_index(sq) for sq in ["f2", "g3", "h4"])
+        # the knight can only block
+        assert [dest for src, dest in self.legal_squares(board, WHITE) if src == "e4"] == ["f2", "g3"]
+
+    def test_double_check_only_king_moves(self):
+        board = fen_to_board("4k3/8/8/8/8/5n2/3N4/4K2r w")
+        _, checkers, _ = get_pins_and_checkers(board, WHITE)
+        assert len(checkers) == 2
+        assert {src for src, _ in self.legal_squares(board, WHITE)} == {"e1"}
+
+    def test_king_cannot_step_along_checking_ray(self):
+        board = fen_to_board("4k3/8/8/8/8/8/8/r3K3 w")
+        king_moves = [dest for src, dest in self.legal_squares(board, WHITE) if src == "e1"]
+        assert "f1" not in king_moves
+        assert sorted(king_moves) == ["d2", "e2", "f2"]
+
+    def test_en_passant_exposing_king(self):
+        board = fen_to_board("8/8/8/K2pP2r/8/8/8/7k w")
+        board._ep_index = sq_to_index("d6")
+        assert ("e5", "d6") not in self.legal_squares(board, WHITE)
+        assert ("e5", "e6") in self.legal_squares(board, WHITE)
+
+    def test_captures_and_quiets(self):
+        board = fen_to_board("r3k3/1P6/8/3pP3/8/8/8/4K3 w - d6 0 1")
+        captures = sorted((index_to_sq(src), index_to_sq(dest))
+                          for src, dest in gen_legal_squares(board, WHITE, CAPTURES))
+        quiets = sorted((index_to_sq(src), index_to_sq(dest)) for src, dest in gen_legal_squares(board, WHITE, QUIETS))
+        # en-passant and promotions are generated with the captures
+        assert captures == [("b7", "a8"), ("b7", "b8"), ("e5", "d6")]
+        assert ("e5", "e6") in quiets
+        assert sorted(captures + quiets) == self.legal_squares(board, WHITE)
+
+    def test_checking_moves(self):
+        def checks(board):
+            return sorted((index_to_sq(move.src), index_to_sq(move.dest), move.promotion or "")
+                          for move in gen_checking_moves(board, board.turn))
+
+        # direct checks by each piece type, including a promotion
+        board = fen_to_board("4k3/1P6/8/8/8/2N5/8/R3K3 w - - 0 1")
+        assert checks(board) == [("a1", "a8", ""), ("b7", "b8", "Q"), ("b7", "b8", "R")]
+        # discovered checks: the knight and the king step off the rook's line
+        board = fen_to_board("4k3/8/8/8/4N3/8/8/4R1K1 w - - 0 1")
+        assert len([move for move in checks(board) if move[0] == "e4"]) == 8
+        board = fen_to_board("8/8/8/8/k2K3R/8/8/8 w - - 0 1")
+        assert ("d4", "d5", "") in checks(board)
+        assert ("d4", "e4", "") not in checks(board)
+        # castling with the rook giving check, and an en-passant capture uncovering the bishop
+        board = fen_to_board("5k2/8/8/8/8/8/8/4K2R w K - 0 1")
+        assert ("e1", "g1", "") in checks(board)
+        board = fen_to_board("8/1k6/8/3pP3/8/8/8/4K2B w - d6 0 1")
+        assert ("e5", "d6", "") in checks(board)
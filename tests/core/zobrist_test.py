@@ -0,0 +1,60 @@
+import random
+
+from chess_engine.core.board import BLACK, WHITE, Board, fen_to_board, sq_to_index
+from chess_engine.core.move import move_from_indices
+from chess_engine.core.piece_movement_rules import gen_legal_squares
+from chess_engine.core.zobrist import compute_hash
+
+
+def make(board, src, dest):
+    board.make_move(move_from_indices(board, sq_to_index(src), sq_to_index(dest)))
+
+
+def test_hash_matches_recompute_after_random_moves():
+    rng = random.Random(7)
+    board = Board()
+    start_hash = board.hash
+    color = WHITE
+    plies = 0
+    for _ in range(60):
+        moves = list(gen_legal_squares(board, color))
+        if not moves:
+            break
+        src, dest = rng.choice(moves)
+        board.make_move(move_from_indices(board, src, dest))
+        plies += 1
+        assert board.hash == compute_hash(board)
+        color = not color
+    for _ in range(plies):
+        board.unmake_move()
+        assert board.hash == compute_hash(board)
+    assert board.hash == start_hash
+
+
+def test_transposition_same_hash():
+    b1 = Board()
+    make(b1, "g1", "f3")
+    make(b1, "g8", "f6")
+    make(b1, "b1", "c3")
+    b2 = Board()
+    make(b2, "b1", "c3")
+    make(b2, "g8", "f6")
+    make(b2, "g1", "f3")
+    assert b1.hash == b2.hash
+
+    # knights going out and back is the starting position again
+    b3 = Board()
+    for src, dest in [("g1", "f3"), ("g8", "f6"), ("f3", "g1"), ("f6", "g8")]:
+        make(b3, src, dest)
+    assert b3.hash == Board().hash
+
+
+def test_hash_includes_side_castling_and_ep():
+    fen = "r3k2r/8/8/8/4P3/8/8/R3K2R"
+    assert fen_to_board(fen + " w KQkq -").hash != fen_to_board(fen + " b KQkq -").hash
+    assert fen_to_board(fen + " w KQkq -").hash != fen_to_board(fen + " w Kkq -").hash
+    assert fen_to_board(fen + " b KQkq e3").hash != fen_to_board(fen + " b KQkq -").hash
+    board = fen_to_board(fen + " b KQkq e3")
+    assert board.turn == BLACK
+    assert board.get_ep_capture_index() == sq_to_index("e3")
+    assert board.hash == compute_hash(board)
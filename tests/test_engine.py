@@ -4,12 +4,16 @@ Some of the puzzles are fetched from here: http://wtharvey.com/m8n4.txt
 
 import unittest as T
 
-from chess_engine.core.board import (ROOK, WHITE,
-                                     index_to_sq, load_board,
+from chess_engine.core.board import (BLACK, ROOK, WHITE, Board,
+                                     fen_to_board, index_to_sq, load_board,
                                      sq_to_index)
-from chess_engine.core.move import Move
-from chess_engine.engine import (MIN, dls_minimax,
-                                 gen_all_moves, score_move)
+from chess_engine.core.move import Move, move_from_indices
+from chess_engine.engine import (CHECKMATE, MIN, SearchContext,
+                                 aspiration_search, dls_minimax, evaluate,
+                                 gen_all_moves, has_non_pawn_material, negamax,
+                                 quiescence, search)
+from chess_engine.ordering import score_move
+from chess_engine.stats import SearchStats
 
 
 
@@ -83,3 +87,173 @@ class PositionRankingTest(T.TestCase):
         assert move_list[0].src == sq_to_index("e8")
         assert move_list[0].dest == sq_to_index("f8")
 
+
+class NegamaxTest(T.TestCase):
+    def test_score_is_from_side_to_move(self):
+        board = load_board([
+            [" ", "", "", "k", "", "", "", ""],
+            [" ", "", "", " ", "", "", "", ""],
+            [" ", "", "", "K", "", "", "", ""],
+            [" ", "", "", " ", "", "", "", ""],
+            [" ", "", "", " ", "", "", "", ""],
+            [" ", "", "", " ", "", "", "", ""],
+            [" ", "", "", " ", "", "", "", ""],
+            ["R", "", "", " ", "", "", "", ""],
+        ])
+        ctx = SearchContext(mate_search=True)
+        score = negamax(board, 1, 0, -1 * CHECKMATE - 1, CHECKMATE + 1, WHITE, ctx)
+        assert score == CHECKMATE - 1
+        pv = ctx.principal_variation()
+        assert len(pv) == 1
+        assert index_to_sq(pv[0].src) == "a1"
+        assert index_to_sq(pv[0].dest) == "a8"
+
+        # the same mate, seen from black after white's move
+        board.make_move(pv[0])
+        score = negamax(board, 0, 1, -1 * CHECKMATE - 1, CHECKMATE + 1, BLACK, ctx)
+        assert score == -1 * (CHECKMATE - 1)
+
+    def test_principal_variation_covers_every_ply(self):
+        board = load_board([
+            [" ", " ", "", " ", "k", "", "", ""],
+            [" ", "Q", "", " ", " ", "", "", ""],
+            [" ", " ", "", "K", " ", "", "", ""],
+            [" ", " ", "", " ", " ", "", "", ""],
+            [" ", " ", "", " ", " ", "", "", ""],
+            [" ", " ", "", " ", " ", "", "", ""],
+            [" ", " ", "", " ", " ", "", "", ""],
+            [" ", " ", "", " ", " ", "", "", ""]
+        ])
+        ctx = SearchContext(mate_search=True)
+        score = negamax(board, 3, 0, -1 * CHECKMATE - 1, CHECKMATE + 1, BLACK, ctx)
+        assert score == 0
+        pv = ctx.principal_variation()
+        assert len(pv) == 3
+        assert pv[0].piece == "k"
+        assert pv[1].piece.isupper()
+        assert pv[2].piece.islower()
+
+
+class IterativeDeepeningTest(T.TestCase):
+    def test_stops_at_mate(self):
+        board = load_board([
+            [" ", "", "", "k", "", "", "", ""],
+            [" ", "", "", " ", "", "", "", ""],
+            [" ", "", "", "K", "", "", "", ""],
+            [" ", "", "", " ", "", "", "", ""],
+            [" ", "", "", " ", "", "", "", ""],
+            [" ", "", "", " ", "", "", "", ""],
+            [" ", "", "", " ", "", "", "", ""],
+            ["R", "", "", " ", "", "", "", ""],
+        ])
+        stats = SearchStats()
+        score, moves = search(board, WHITE, max_depth=5, stats=stats)
+        assert score == CHECKMATE - 1
+        assert len(moves) == 1
+        assert index_to_sq(moves[0].dest) == "a8"
+        assert stats.depth == 1
+
+    def test_node_budget(self):
+        board = Board()
+        h = board.hash
+        stats = SearchStats()
+        score, moves = search(board, WHITE, nodes=2000, stats=stats)
+        assert stats.nodes == 2000
+        # the result comes from the last completed iteration
+        assert len(moves) == stats.depth
+        # the moves of the aborted iteration are taken back
+        assert board.hash == h
+        assert board._undo == []
+
+    def test_first_iteration_always_completes(self):
+        board = Board()
+        score, moves = search(board, WHITE, time_ms=0)
+        assert len(moves) == 1
+
+
+class SelectiveSearchTest(T.TestCase):
+    def test_deeper_for_the_same_nodes(self):
+        depths = []
+        for selective in (False, True):
+            board = fen_to_board("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10")
+            stats = SearchStats()
+            search(board, WHITE, nodes=20000, stats=stats, null_move=selective, reductions=selective)
+            assert board._undo == []
+            depths.append(stats.depth)
+        assert depths[1] > depths[0]
+
+    def test_zugzwang_guard(self):
+        assert has_non_pawn_material(fen_to_board("4k3/8/8/8/8/8/4P3/4KN2 w"), WHITE)
+        assert not has_non_pawn_material(fen_to_board("4k3/8/8/8/8/8/4P3/4KN2 w"), BLACK)
+        assert not has_non_pawn_material(fen_to_board("4k3/4p3/8/8/8/8/4P3/4K3 w"), WHITE)
+
+    def test_off_in_mate_search(self):
+        ctx = SearchContext(mate_search=True)
+        assert not ctx.null_move
+        assert not ctx.reductions
+        ctx = SearchContext(null_move=False)
+        assert not ctx.null_move
+        assert ctx.reductions
+
+
+class AspirationTest(T.TestCase):
+    FEN = "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10"
+
+    def exact_score(self, depth):
+        board = fen_to_board(self.FEN)
+        ctx = SearchContext(null_move=False, reductions=False)
+        return negamax(board, depth, 0, -1 * CHECKMATE - 1, CHECKMATE + 1, WHITE, ctx)
+
+    def test_same_score_as_full_window(self):
+        expected = self.exact_score(3)
+        for guess in (expected, expected - 500, expected + 500):
+            board = fen_to_board(self.FEN)
+            ctx = SearchContext(null_move=False, reductions=False)
+            assert aspiration_search(board, 3, guess, WHITE, ctx) == expected
+            # a wrong guess fails low or high, and the window is widened until the score is inside it
+            assert (ctx.stats.aspiration_researches > 0) == (guess != expected)
+            assert len(ctx.principal_variation()) == 3
+
+    def test_research_counts(self):
+        board = fen_to_board(self.FEN)
+        stats = SearchStats()
+        search(board, WHITE, max_depth=5, stats=stats)
+        assert stats.pvs_researches > 0
+        assert stats.aspiration_researches >= 0
+
+
+class QuiescenceTest(T.TestCase):
+    def qsearch(self, board, color):
+        return quiescence(board, 0, -1 * CHECKMATE - 1, CHECKMATE + 1, color, SearchContext())
+
+    def after(self, board, *moves):
+        """Static evaluation for white after the moves"""
+        for src, dest in moves:
+            board.make_move(move_from_indices(board, sq_to_index(src), sq_to_index(dest)))
+        score = evaluate(board, WHITE)
+        for _ in moves:
+            board.unmake_move()
+        return score
+
+    def test_wins_hanging_piece(self):
+        board = fen_to_board("4k3/8/8/3q4/8/8/3R4/4K3 w")
+        assert self.qsearch(board, WHITE) == self.after(board, ("d2", "d5"))
+
+    def test_recapture(self):
+        # the queen is defended, but winning it for the rook is still better than standing pat
+        board = fen_to_board("4k3/8/2p5/3q4/8/8/3R4/4K3 w")
+        assert self.qsearch(board, WHITE) == self.after(board, ("d2", "d5"), ("c6", "d5"))
+        # a defended pawn is not worth the rook, so stand pat
+        board = fen_to_board("4k3/8/2p5/3p4/8/8/3R4/4K3 w")
+        assert self.qsearch(board, WHITE) == evaluate(board, WHITE)
+
+    def test_mate_in_check(self):
+        # black is already checkmated by the rook
+        board = fen_to_board("R3k3/8/4K3/8/8/8/8/8 b")
+        assert self.qsearch(board, BLACK) == -1 * CHECKMATE
+
+    def test_search_uses_material(self):
+        board = fen_to_board("4k3/8/2p5/3p4/8/8/3R4/4K3 w")
+        score, moves = search(board, WHITE, max_depth=2)
+        assert not (moves[0].dest == sq_to_index("d5"))
+        assert score > 200
@@ -0,0 +1,44 @@
+import unittest as T
+
+from chess_engine.core.board import BLACK, WHITE, Board, fen_to_board
+from chess_engine.core.move import move_from_indices
+from chess_engine.core.piece_movement_rules import gen_legal_squares
+from chess_engine.core.pst import MAX_PHASE, compute_eval
+from chess_engine.engine import score_board
+from chess_engine.evaluation import evaluate
+
+
+class EvaluationTest(T.TestCase):
+    def test_symmetric(self):
+        board = Board()
+        assert evaluate(board, WHITE) == 0
+        assert board._phase == MAX_PHASE
+        board = fen_to_board("4k3/8/8/3q4/8/8/3R4/4K3 w")
+        assert evaluate(board, WHITE) < -300
+        assert evaluate(board, BLACK) == -1 * evaluate(board, WHITE)
+        mirrored = fen_to_board("4k3/3r4/8/8/3Q4/8/8/4K3 w")
+        assert evaluate(mirrored, BLACK) == evaluate(board, WHITE)
+
+    def test_tapering(self):
+        # a king in the centre is bad with the queens on, and good in a pawn ending
+        middlegame = fen_to_board("rnbqkbnr/pppppppp/8/8/4K3/8/PPPPPPPP/RNBQ1BNR w")
+        endgame = fen_to_board("4k3/pppppppp/8/8/4K3/8/PPPPPPPP/8 w")
+        assert endgame._phase == 0
+        assert evaluate(middlegame, WHITE) < 0
+        assert evaluate(endgame, WHITE) > 0
+
+    def test_totals_follow_moves(self):
+        board = fen_to_board("r3k2r/1P6/8/3pP3/8/8/8/R3K2R w - d6 0 1")
+        start = (board._mg, board._eg, board._phase)
+        for src, dest in list(gen_legal_squares(board, WHITE)):
+            move = move_from_indices(board, src, dest)
+            if dest < 30 and src // 10 == 3:
+                move.promotion = "Q"
+            board.make_move(move)
+            assert (board._mg, board._eg, board._phase) == compute_eval(board._board)
+            board.unmake_move()
+            assert (board._mg, board._eg, board._phase) == start
+
+    def test_score_board(self):
+        board = fen_to_board("4k3/8/8/3q4/8/8/3R4/4K3 w")
+        assert score_board(board) == -4
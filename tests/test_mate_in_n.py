@@ -1,12 +1,17 @@
+import glob
 import sys
 import unittest as T
 from typing import List
 
-from chess_engine.core.board import (BISHOP, WHITE, Board, fen_to_board,
-                                     index_to_sq, load_board, print_board,
-                                     sq_to_index)
+import chess.pgn
+from chess_engine.core.board import (BISHOP, BLACK, WHITE, Board,
+                                     fen_to_board, index_to_sq, load_board,
+                                     print_board, sq_to_index)
 from chess_engine.core.move import Move
-from chess_engine.engine import CHECKMATE, find_mate_in_n
+from chess_engine.core.piece_movement_rules import is_in_checkmate
+from chess_engine.engine import CHECKMATE, find_mate_in_n, find_mate_in_n_pns
+from chess_engine.proof_number import DfpnSolver
+from chess_engine.stats import ProofNumberStats, SearchStats
 
 
 def write_mate_result(board: Board, moves: List[Move], fp) -> None:
@@ -116,11 +121,11 @@ class MateInTwoTest(T.TestCase):
 class MateInThreeTest(T.TestCase):
     def assert_find_mate(self, fen: str):
         board = fen_to_board(fen)
-        stats_dict = {}  # type: dict
-        result, mating_moves = find_mate_in_n(board, WHITE, 3, stats_dict=stats_dict)
+        stats = SearchStats()
+        result, mating_moves = find_mate_in_n(board, WHITE, 3, stats=stats)
         with open("mate.txt", "w") as fp:
            write_mate_result(board, mating_moves, fp)
-        print(stats_dict)
+        print(stats)
         assert result == CHECKMATE
         assert len(mating_moves) == 5
 
@@ -159,12 +164,12 @@ class MateInThreeTest(T.TestCase):
 class MateInFourTest(T.TestCase):
     def assert_find_mate_in_4(self, fen: str):
         board = fen_to_board(fen)
-        stats_dict = {}  # type: dict
+        stats = SearchStats()
         print_board(board)
-        result, mating_moves = find_mate_in_n(board, WHITE, 4, stats_dict=stats_dict)
+        result, mating_moves = find_mate_in_n(board, WHITE, 4, stats=stats)
         with open("mate.txt", "w") as fp:
            write_mate_result(board, mating_moves, fp)
-        print(stats_dict)
+        print(stats)
         assert result == CHECKMATE
         assert len(mating_moves) == 7
 
@@ -175,6 +180,123 @@ class MateInFourTest(T.TestCase):
         self.assert_find_mate_in_4("r5rk/2p1Nppp/3p3P/pp2p1P1/4P3/2qnPQK1/8/R6R w")
 
 
+class ChecksOnlyTest(T.TestCase):
+    def test_mate_by_checks(self):
+        board = fen_to_board("r1b1r1k1/1pq1bp1p/p3pBp1/3pR3/7Q/2PB4/PP3PPP/5RK1 w")
+        full_stats = SearchStats()
+        find_mate_in_n(board, WHITE, 3, stats=full_stats)
+        stats = SearchStats()
+        result, mating_moves = find_mate_in_n(board, WHITE, 3, stats=stats, checks_only=True)
+        assert result == CHECKMATE
+        assert len(mating_moves) == 5
+        assert stats.nodes < full_stats.nodes
+
+    def test_quiet_first_move(self):
+        """The mate starts with an under-promotion which is not a check"""
+        board = fen_to_board("5B2/6P1/1p6/8/1N6/kP6/2K5/8 w")
+        result, _ = find_mate_in_n(board, WHITE, 3)
+        assert result == CHECKMATE
+        result, _ = find_mate_in_n(board, WHITE, 3, checks_only=True)
+        assert result != CHECKMATE
+
+
+class ParallelMateTest(T.TestCase):
+    def test_mate_in_4(self):
+        board = fen_to_board("r5rk/2p1Nppp/3p3P/pp2p1P1/4P3/2qnPQK1/8/R6R w")
+        stats = SearchStats()
+        result, mating_moves = find_mate_in_n(board, WHITE, 4, stats=stats, workers=2)
+        assert result == CHECKMATE
+        assert len(mating_moves) == 7
+        assert stats.nodes > 0
+
+    def test_no_mate(self):
+        board = fen_to_board("4k3/8/8/8/8/8/8/2R1K3 w")
+        result, mating_moves = find_mate_in_n(board, WHITE, 1, workers=2)
+        assert result == 0
+        assert len(mating_moves) == 1
+
+
+class BlackToMateTest(T.TestCase):
+    def test_searches_agree(self):
+        board = fen_to_board("r6k/8/8/8/8/8/5PPP/6K1 b")
+        for search in (lambda: find_mate_in_n(board, BLACK, 1),
+                       lambda: find_mate_in_n(board, BLACK, 1, workers=2),
+                       lambda: find_mate_in_n_pns(board, BLACK, 1)):
+            result, mating_moves = search()
+            assert result == CHECKMATE
+            assert [(index_to_sq(move.src), index_to_sq(move.dest)) for move in mating_moves] == [("a8", "a1")]
+
+
+class ProofNumberTest(T.TestCase):
+    def assert_mates(self, board: Board, color, moves: List[Move]):
+        for move in moves:
+            board.make_move(move)
+        assert is_in_checkmate(board, (not color))
+        for _ in moves:
+            board.unmake_move()
+
+    def test_mate_in_2(self):
+        board = fen_to_board("1r6/4b2k/1q1pNrpp/p2Pp3/4P3/1P1R3Q/5PPP/5RK1 w")
+        stats = ProofNumberStats()
+        result, mating_moves = find_mate_in_n_pns(board, WHITE, 2, stats=stats)
+        assert result == CHECKMATE
+        assert len(mating_moves) == 3
+        self.assert_mates(board, WHITE, mating_moves)
+        assert stats.proof_nodes > 0
+
+    def test_mate_in_4(self):
+        board = fen_to_board("r5rk/2p1Nppp/3p3P/pp2p1P1/4P3/2qnPQK1/8/R6R w")
+        result, mating_moves = find_mate_in_n_pns(board, WHITE, 4)
+        assert result == CHECKMATE
+        assert len(mating_moves) == 7
+        self.assert_mates(board, WHITE, mating_moves)
+
+    def test_mate_in_5(self):
+        board = fen_to_board("2q1nk1r/4Rp2/1ppp1P2/6Pp/3p1B2/3P3P/PPP1Q3/6K1 w")
+        result, mating_moves = find_mate_in_n_pns(board, WHITE, 5)
+        assert result == CHECKMATE
+        assert len(mating_moves) == 9
+        self.assert_mates(board, WHITE, mating_moves)
+
+    def test_no_mate(self):
+        board = fen_to_board("1r3r1k/5Bpp/8/8/P2qQ3/5R2/1b4PP/5K2 w")
+        stats = ProofNumberStats()
+        result, mating_moves = find_mate_in_n_pns(board, WHITE, 2, stats=stats)
+        assert result == 0
+        assert mating_moves == []
+        assert stats.disproof_nodes > 0
+
+    def test_weird_mates(self):
+        """The last two moves of each game are a mate in 2"""
+        for fname in sorted(glob.glob("data/weird-mates/*.pgn")):
+            with open(fname) as fp:
+                moves = list(chess.pgn.read_game(fp).mainline_moves())
+            position = chess.Board()
+            for move in moves[:-3]:
+                position.push(move)
+            color = (WHITE if position.turn == chess.WHITE else BLACK)
+            board = fen_to_board(position.fen())
+            result, mating_moves = find_mate_in_n_pns(board, color, 2)
+            assert result == CHECKMATE, fname
+            self.assert_mates(board, color, mating_moves)
+
+    def test_memory_cap(self):
+        board = fen_to_board("2q1nk1r/4Rp2/1ppp1P2/6Pp/3p1B2/3P3P/PPP1Q3/6K1 w")
+        solver = DfpnSolver()
+        solver.max_entries = 64
+        proven, mating_moves = solver.solve(board, WHITE, 9)
+        assert proven
+        assert len(mating_moves) == 9
+        assert solver.collections > 0
+        assert len(solver.table) <= 64
+
+    def test_node_limit(self):
+        board = fen_to_board("2q1nk1r/4Rp2/1ppp1P2/6Pp/3p1B2/3P3P/PPP1Q3/6K1 w")
+        stats = ProofNumberStats()
+        result, mating_moves = find_mate_in_n_pns(board, WHITE, 5, stats=stats, max_nodes=10)
+        assert (result, mating_moves) == (0, [])
+        assert not stats.solved
+
 
 # class MateInFiveTest(T.TestCase):
 #     def test_mate_in_5_p1(self):
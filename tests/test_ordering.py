@@ -0,0 +1,123 @@
+import unittest as T
+
+from chess_engine.core.board import BLACK, WHITE, fen_to_board, sq_to_index
+from chess_engine.core.move import encode_move, move_from_indices
+from chess_engine.engine import gen_all_moves
+from chess_engine.ordering import (HASH_MOVE_SCORE, KILLER_SCORE, MoveOrdering,
+                                   decode_legal_move, gen_staged_moves,
+                                   gives_direct_check, pick_best, score_move)
+
+
+def make_move(board, src, dest):
+    return move_from_indices(board, sq_to_index(src), sq_to_index(dest))
+
+
+class DirectCheckTest(T.TestCase):
+    def test_rook(self):
+        board = fen_to_board("4k3/8/8/8/8/8/8/R3K1N1 w - - 0 1")
+        king = sq_to_index("e8")
+        assert gives_direct_check(board, make_move(board, "a1", "a8"), king)
+        assert not gives_direct_check(board, make_move(board, "a1", "a7"), king)
+        assert not gives_direct_check(board, make_move(board, "g1", "f3"), king)
+
+    def test_pawn_and_knight(self):
+        king = sq_to_index("e8")
+        board = fen_to_board("4k3/8/3P4/8/8/8/8/4K1N1 w - - 0 1")
+        assert gives_direct_check(board, make_move(board, "d6", "d7"), king)
+        board = fen_to_board("4k3/8/8/3N4/8/8/8/4K3 w - - 0 1")
+        assert gives_direct_check(board, make_move(board, "d5", "f6"), king)
+        assert not gives_direct_check(board, make_move(board, "d5", "e7"), king)
+
+    def test_blocked_slider(self):
+        king = sq_to_index("e8")
+        board = fen_to_board("4k3/4p3/8/8/8/8/8/R3K3 w - - 0 1")
+        assert not gives_direct_check(board, make_move(board, "a1", "e1"), king)
+        # the moving piece does not block its own line
+        board = fen_to_board("4k3/8/8/8/8/8/4B3/4K3 w - - 0 1")
+        assert not gives_direct_check(board, make_move(board, "e2", "a6"), king)
+        board = fen_to_board("4k3/8/8/8/B7/8/8/4K3 w - - 0 1")
+        assert gives_direct_check(board, make_move(board, "a4", "b5"), king)
+
+
+class ScoreMoveTest(T.TestCase):
+    def test_mvv_lva(self):
+        board = fen_to_board("4k3/8/2q5/1P3r2/3N4/8/8/4K3 w - - 0 1")
+        pawn_takes_queen = score_move(board, make_move(board, "b5", "c6"))
+        knight_takes_queen = score_move(board, make_move(board, "d4", "c6"))
+        knight_takes_rook = score_move(board, make_move(board, "d4", "f5"))
+        quiet = score_move(board, make_move(board, "d4", "b3"))
+        assert pawn_takes_queen > knight_takes_queen > knight_takes_rook > quiet
+
+    def test_promotion(self):
+        board = fen_to_board("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+        moves = list(gen_all_moves(board, WHITE))
+        best = next(pick_best(moves, [score_move(board, move) for move in moves]))
+        assert best.promotion == "Q"
+
+    def test_losing_capture(self):
+        # the pawn on d5 is defended, so taking it with the queen loses material
+        board = fen_to_board("4k3/8/2p5/3p4/8/8/8/3QK3 w - - 0 1")
+        queen_takes_pawn = score_move(board, make_move(board, "d1", "d5"))
+        quiet = score_move(board, make_move(board, "d1", "d2"))
+        assert queen_takes_pawn < quiet
+        assert score_move(board, make_move(board, "d1", "d5"), use_see=False) > quiet
+
+
+class MoveOrderingTest(T.TestCase):
+    def test_hash_move_first(self):
+        board = fen_to_board("4k3/8/8/2q5/1P6/8/8/4K3 w - - 0 1")
+        moves = list(gen_all_moves(board, WHITE))
+        hash_move = make_move(board, "e1", "d1")
+        scores = MoveOrdering().score_moves(board, moves, 0, encode_move(hash_move))
+        ordered = list(pick_best(moves, scores))
+        assert encode_move(ordered[0]) == encode_move(hash_move)
+        assert max(scores) == HASH_MOVE_SCORE
+        # then the capture
+        assert ordered[1].is_capture
+
+    def test_killers_and_history(self):
+        board = fen_to_board("4k3/8/8/8/8/8/8/R3K3 b - - 0 1")
+        ordering = MoveOrdering()
+        killer = make_move(board, "e8", "d7")
+        ordering.record_cutoff(board, killer, 3, 2)
+        moves = list(gen_all_moves(board, BLACK))
+        scores = ordering.score_moves(board, moves, 3)
+        ordered = list(pick_best(moves, scores))
+        assert encode_move(ordered[0]) == encode_move(killer)
+        assert max(scores) >= KILLER_SCORE
+        # killers are kept per ply, the history table is shared
+        scores = ordering.score_moves(board, moves, 2)
+        assert max(scores) == 4
+
+
+class StagedMovesTest(T.TestCase):
+    def test_stages(self):
+        board = fen_to_board("4k3/8/8/2q5/1P6/8/8/4K2R w - - 0 1")
+        ordering = MoveOrdering()
+        killer = make_move(board, "h1", "h7")
+        ordering.killers_at(1)[0] = encode_move(killer)
+        hash_move = make_move(board, "e1", "d1")
+        moves = [encode_move(move) for move in gen_staged_moves(board, WHITE, ordering, 1, encode_move(hash_move))]
+        assert moves[0] == encode_move(hash_move)
+        assert moves[1] == encode_move(make_move(board, "b4", "c5"))
+        assert moves[2] == encode_move(killer)
+        # every legal move exactly once
+        assert sorted(moves) == sorted(encode_move(move) for move in gen_all_moves(board, WHITE))
+
+    def test_losing_captures_last(self):
+        board = fen_to_board("4k3/8/2p5/3p4/8/8/8/3QK3 w - - 0 1")
+        moves = [encode_move(move) for move in gen_staged_moves(board, WHITE, MoveOrdering(), 0)]
+        assert moves[-1] == encode_move(make_move(board, "d1", "d5"))
+        assert sorted(moves) == sorted(encode_move(move) for move in gen_all_moves(board, WHITE))
+        moves = [encode_move(move) for move in gen_staged_moves(board, WHITE, MoveOrdering(use_see=False), 0)]
+        assert moves[0] == encode_move(make_move(board, "d1", "d5"))
+
+    def test_invalid_hash_move(self):
+        board = fen_to_board("4k3/8/8/2q5/1P6/8/8/4K2R w - - 0 1")
+        # not legal for white, or not a move at all
+        assert decode_legal_move(board, WHITE, encode_move(make_move(board, "c5", "c1"))) is None
+        assert decode_legal_move(board, BLACK, encode_move(make_move(board, "h1", "h7"))) is None
+        assert decode_legal_move(board, WHITE, encode_move(make_move(board, "h1", "g2"))) is None
+        assert decode_legal_move(board, WHITE, sq_to_index("b4") | (sq_to_index("b5") << 7) | (5 << 14)) is None
+        moves = list(gen_staged_moves(board, WHITE, MoveOrdering(), 0, encode_move(make_move(board, "h1", "g2"))))
+        assert len(moves) == len(list(gen_all_moves(board, WHITE)))
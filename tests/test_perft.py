@@ -0,0 +1,82 @@
+import unittest as T
+
+from chess_engine.core.board import (WHITE, Board, board_to_bytes,
+                                     bytes_to_board, fen_to_board, index_to_sq,
+                                     sq_to_index)
+from chess_engine.core.move import move_from_indices
+from chess_engine.core.piece_movement_rules import gen_legal_squares
+from chess_engine.perft import (PERFT_SUITE, divide, move_to_uci,
+                                parallel_divide, parallel_perft, perft)
+
+
+class PerftTest(T.TestCase):
+    def test_suite(self):
+        for name, fen, expected in PERFT_SUITE:
+            board = fen_to_board(fen)
+            h = board.hash
+            for depth, nodes in enumerate(expected[:2], 1):
+                assert perft(board, depth) == nodes, name
+            assert board.hash == h
+
+    def test_kiwipete_depth_3(self):
+        # castling, en-passant, promotions and pins all show up at this depth
+        name, fen, expected = PERFT_SUITE[1]
+        assert perft(fen_to_board(fen), 3) == expected[2]
+
+    def test_divide(self):
+        board = Board()
+        counts = divide(board, 2)
+        assert len(counts) == 20
+        assert counts["e2e4"] == 20
+        assert sum(counts.values()) == 400
+
+    def castles(self, fen):
+        board = fen_to_board(fen)
+        e1 = sq_to_index("e1")
+        return sorted(index_to_sq(dest) for src, dest in gen_legal_squares(board, WHITE)
+                      if src == e1 and dest in (sq_to_index("c1"), sq_to_index("g1")))
+
+    def test_castling_generated(self):
+        assert self.castles("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1") == ["c1", "g1"]
+        # without the right
+        assert self.castles("r3k2r/8/8/8/8/8/8/R3K2R w Qkq - 0 1") == ["c1"]
+        # not through an attacked square
+        assert self.castles("r3k2r/8/8/8/8/8/5r2/R3K2R w KQkq - 0 1") == ["c1"]
+        # not out of check
+        assert self.castles("r3k2r/8/8/8/8/8/4r3/R3K2R w KQkq - 0 1") == []
+
+    def test_move_to_uci(self):
+        board = fen_to_board("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+        move = move_from_indices(board, sq_to_index("b7"), sq_to_index("b8"))
+        move.promotion = "Q"
+        assert move_to_uci(move) == "b7b8q"
+
+
+class ParallelPerftTest(T.TestCase):
+    def test_serialisation(self):
+        board = fen_to_board("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 1")
+        data = board_to_bytes(board)
+        assert len(data) == 67
+        copy = bytes_to_board(data)
+        assert copy._board == board._board
+        assert copy.hash == board.hash
+        assert copy.turn == board.turn
+        assert copy._ep_index == sq_to_index("f6")
+
+    def test_parallel_divide(self):
+        name, fen, expected = PERFT_SUITE[1]
+        board = fen_to_board(fen)
+        assert parallel_divide(board, 2, workers=2) == divide(board, 2)
+        # split two plies below the root, merged back into the root moves
+        assert parallel_divide(board, 3, workers=2, split_depth=2) == divide(board, 3)
+
+    def test_parallel_divide_mating_move(self):
+        # Qh4 is mate, so nothing is left to split two plies below the root
+        board = fen_to_board("rnbqkbnr/pppp1ppp/8/4p3/6P1/5P2/PPPPP2P/RNBQKBNR b KQkq g3 0 2")
+        counts = parallel_divide(board, 2, workers=2, split_depth=2)
+        assert counts["d8h4"] == 0
+        assert counts == divide(board, 2)
+
+    def test_parallel_perft(self):
+        name, fen, expected = PERFT_SUITE[2]
+        assert parallel_perft(fen_to_board(fen), 3, workers=2) == expected[2]
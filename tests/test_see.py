@@ -0,0 +1,57 @@
+import unittest as T
+
+from chess_engine.core.board import fen_to_board, sq_to_index
+from chess_engine.core.move import move_from_indices
+from chess_engine.see import SEE_VALUES, see
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN = SEE_VALUES[1:6]
+
+
+def make_move(board, src, dest):
+    return move_from_indices(board, sq_to_index(src), sq_to_index(dest))
+
+
+class SeeTest(T.TestCase):
+    def test_undefended(self):
+        board = fen_to_board("1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1")
+        assert see(board, make_move(board, "e1", "e5")) == PAWN
+
+    def test_defended(self):
+        board = fen_to_board("4k3/8/2p5/3p4/8/8/8/3QK3 w - - 0 1")
+        assert see(board, make_move(board, "d1", "d5")) == PAWN - QUEEN
+
+    def test_x_ray(self):
+        # the queen behind the knight joins in once the knight has captured
+        board = fen_to_board("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1")
+        assert see(board, make_move(board, "d3", "e5")) == PAWN - KNIGHT
+        # the rook is defended by the queen behind it, so the second rook does not win anything
+        board = fen_to_board("4k3/8/2p5/3p4/8/8/3R4/3QK3 w - - 0 1")
+        assert see(board, make_move(board, "d2", "d5")) == PAWN - ROOK + PAWN
+
+    def test_stop_capturing(self):
+        # black does not take back with the queen, as the bishop would recapture it
+        board = fen_to_board("4k3/8/8/3q4/8/1B6/8/3RK3 w - - 0 1")
+        assert see(board, make_move(board, "d1", "d5")) == QUEEN
+
+    def test_king_recapture(self):
+        board = fen_to_board("8/8/4k3/3p4/8/8/8/3RK3 w - - 0 1")
+        assert see(board, make_move(board, "d1", "d5")) == PAWN - ROOK
+        # the king cannot recapture a defended piece
+        board = fen_to_board("8/8/4k3/3p4/8/1B6/8/3RK3 w - - 0 1")
+        assert see(board, make_move(board, "d1", "d5")) == PAWN
+
+    def test_en_passant_and_promotion(self):
+        board = fen_to_board("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1")
+        assert see(board, make_move(board, "e5", "d6")) == PAWN
+        board = fen_to_board("r3k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+        move = make_move(board, "b7", "b8")
+        move.promotion = "Q"
+        assert see(board, move) == PAWN - QUEEN + QUEEN - PAWN - PAWN
+        board.make_move(move)
+        board.unmake_move()
+
+    def test_board_unchanged(self):
+        board = fen_to_board("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1")
+        before = list(board._board)
+        see(board, make_move(board, "d3", "e5"))
+        assert list(board._board) == before
@@ -0,0 +1,28 @@
+import unittest as T
+
+from chess_engine.core.board import WHITE, board_to_bytes, fen_to_board
+from chess_engine.core.move import encode_move
+from chess_engine.engine import CHECKMATE, search
+from chess_engine.smp import smp_search
+from chess_engine.stats import SearchStats
+
+
+class SmpSearchTest(T.TestCase):
+    def test_mate(self):
+        board = fen_to_board("r5rk/5p1p/5R2/4B3/8/8/7P/7K w")
+        before = board_to_bytes(board)
+        stats = SearchStats()
+        score, moves = smp_search(board, WHITE, workers=2, max_depth=5, size_mb=1, stats=stats)
+        assert score == CHECKMATE - 5
+        assert encode_move(moves[0]) == encode_move(search(board, WHITE, max_depth=5)[1][0])
+        assert board_to_bytes(board) == before
+        assert stats.depth == max(stats.worker_depths)
+        assert len(stats.worker_depths) == 2
+        assert stats.nodes > 0
+
+    def test_same_result_as_search(self):
+        board = fen_to_board("4k3/8/8/2q5/1P6/8/8/4K3 w - - 0 1")
+        score, moves = smp_search(board, WHITE, workers=2, max_depth=3, size_mb=1)
+        expected_score, expected_moves = search(board, WHITE, max_depth=3)
+        assert score == expected_score
+        assert encode_move(moves[0]) == encode_move(expected_moves[0])
@@ -0,0 +1,85 @@
+import json
+import pickle
+import unittest as T
+
+from chess_engine.core.board import WHITE, fen_to_board
+from chess_engine.engine import find_mate_in_n_pns, search
+from chess_engine.stats import ProofNumberStats, SearchStats
+
+
+class SearchStatsTest(T.TestCase):
+    def test_slots(self):
+        stats = SearchStats()
+        with self.assertRaises(AttributeError):
+            stats.nodes_explored = 1
+        # sent back from worker processes
+        stats.nodes = 5
+        assert pickle.loads(pickle.dumps(stats)).nodes == 5
+
+    def test_rates(self):
+        stats = SearchStats()
+        assert stats.first_move_cutoff_rate == 0.0
+        assert stats.nps == 0.0
+        stats.beta_cutoffs = 10
+        stats.first_move_cutoffs = 9
+        stats.nodes = 1000
+        stats.elapsed = 0.5
+        assert stats.first_move_cutoff_rate == 0.9
+        assert stats.nps == 2000.0
+        stats.record_iteration(1, 20, 0.01)
+        stats.record_iteration(2, 100, 0.05)
+        stats.record_iteration(3, 800, 0.4)
+        assert stats.depth == 3
+        assert stats.branching_factors() == {2: 5.0, 3: 8.0}
+
+    def test_export(self):
+        stats = SearchStats()
+        stats.nodes = 120
+        stats.record_iteration(1, 20, 0.01)
+        stats.record_iteration(2, 100, 0.05)
+        data = json.loads(stats.to_json())
+        assert data["nodes"] == 120
+        assert data["iterations"][1] == {"depth": 2, "nodes": 100, "time": 0.05, "branching_factor": 5.0}
+        line = stats.to_log_line()
+        assert "\n" not in line
+        pairs = dict(pair.split("=") for pair in line.split(" "))
+        assert pairs["nodes"] == "120"
+        assert pairs["depth2_bf"] == "5.00"
+        assert "depth1_bf" not in pairs
+        assert pairs["depth1_nodes"] == "20"
+
+    def test_merge(self):
+        first = SearchStats()
+        first.nodes = 10
+        first.record_iteration(3, 10, 0.1)
+        second = SearchStats()
+        second.nodes = 5
+        second.record_iteration(2, 5, 0.1)
+        first.merge(second)
+        assert first.nodes == 15
+        assert first.depth == 3
+        assert len(first.iterations) == 2
+
+
+class FilledBySearchTest(T.TestCase):
+    def test_search(self):
+        board = fen_to_board("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10")
+        stats = SearchStats()
+        search(board, WHITE, max_depth=4, stats=stats)
+        assert [depth for depth, _, _ in stats.iterations] == [1, 2, 3, 4]
+        assert sum(nodes for _, nodes, _ in stats.iterations) == stats.nodes
+        assert 0 < stats.qnodes < stats.nodes
+        assert 0 < stats.tt_hits <= stats.tt_probes
+        assert 0 < stats.first_move_cutoffs <= stats.beta_cutoffs
+        assert stats.elapsed > 0
+        # searches add to the same object
+        search(board, WHITE, max_depth=2, stats=stats)
+        assert len(stats.iterations) == 6
+
+    def test_proof_number_search(self):
+        board = fen_to_board("1r6/4b2k/1q1pNrpp/p2Pp3/4P3/1P1R3Q/5PPP/5RK1 w")
+        stats = ProofNumberStats()
+        find_mate_in_n_pns(board, WHITE, 2, stats=stats)
+        assert stats.solved
+        assert stats.nodes > 0
+        assert json.loads(stats.to_json())["proof_nodes"] == stats.proof_nodes
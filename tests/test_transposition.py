@@ -0,0 +1,88 @@
+import unittest as T
+
+from chess_engine.core.board import WHITE, fen_to_board, sq_to_index
+from chess_engine.core.move import decode_move, encode_move, move_from_indices
+from chess_engine.engine import CHECKMATE, find_mate_in_n
+from chess_engine.stats import SearchStats
+from chess_engine.transposition import (EXACT, LOWER, UPPER,
+                                        SharedTranspositionTable,
+                                        TranspositionTable, pack_entry,
+                                        unpack_entry)
+
+
+class TranspositionTableTest(T.TestCase):
+    def test_pack_entry(self):
+        for depth, score, bound, move in [(0, 0, EXACT, 0), (12, -9995, LOWER, 12345), (255, 9990, UPPER, 1)]:
+            assert unpack_entry(pack_entry(depth, score, bound, move, 3)) == (depth, score, bound, move)
+
+    def test_memory_budget(self):
+        tt = TranspositionTable(size_mb=1)
+        assert len(tt) * 16 <= 1024 * 1024
+        assert len(tt) * 16 > 512 * 1024
+
+    def test_store_and_probe(self):
+        tt = TranspositionTable(size_mb=1)
+        assert tt.probe(42) is None
+        tt.store(42, 3, -17, UPPER, 999)
+        assert tt.probe(42) == (3, -17, UPPER, 999)
+        # storing without a move keeps the previous best move
+        tt.store(42, 4, 5, EXACT)
+        assert tt.probe(42) == (4, 5, EXACT, 999)
+        assert tt.hits == 2
+        assert tt.misses == 1
+
+    def test_replacement(self):
+        tt = TranspositionTable(size_mb=1)
+        buckets = len(tt) // 2
+        deep, shallow, other = 7, 7 + buckets, 7 + 2 * buckets
+        tt.store(deep, 10, 1, EXACT)
+        # a shallower search goes to the always-replace slot
+        tt.store(shallow, 2, 2, EXACT)
+        assert tt.probe(deep) == (10, 1, EXACT, 0)
+        assert tt.probe(shallow) == (2, 2, EXACT, 0)
+        tt.store(other, 1, 3, EXACT)
+        assert tt.collisions == 1
+        assert tt.probe(shallow) is None
+        assert tt.probe(deep) is not None
+        # a new search may replace the depth-preferred entry
+        tt.new_search()
+        tt.store(shallow, 1, 4, EXACT)
+        assert tt.probe(deep) is None
+
+    def test_encode_move(self):
+        board = fen_to_board("4k3/1P6/8/8/8/8/8/4K3 w")
+        move = move_from_indices(board, sq_to_index("b7"), sq_to_index("b8"))
+        move.promotion = "N"
+        decoded = decode_move(board, encode_move(move))
+        assert (decoded.src, decoded.dest, decoded.promotion) == (move.src, move.dest, "N")
+
+    def test_mate_search_uses_table(self):
+        board = fen_to_board("r5rk/5p1p/5R2/4B3/8/8/7P/7K w")
+        tt = TranspositionTable(size_mb=1)
+        stats = SearchStats()
+        result, _ = find_mate_in_n(board, WHITE, 3, stats=stats, tt=tt)
+        assert result == CHECKMATE
+        assert tt.hits > 0
+        assert stats.tt_hits == tt.hits
+        assert stats.tt_probes == tt.hits + tt.misses
+
+    def test_torn_entry(self):
+        tt = TranspositionTable(size_mb=1)
+        tt.store(42, 3, -17, UPPER, 999)
+        i = (42 % (len(tt) // 2)) * 2
+        # data overwritten by another writer without its key
+        tt._data[i] = pack_entry(5, 1, EXACT, 0, 0)
+        assert tt.probe(42) is None
+
+
+class SharedTranspositionTableTest(T.TestCase):
+    def test_shared_between_handles(self):
+        owner = SharedTranspositionTable(size_mb=1)
+        try:
+            other = SharedTranspositionTable(size_mb=1, name=owner.name)
+            other.store(42, 3, -17, UPPER, 999)
+            assert owner.probe(42) == (3, -17, UPPER, 999)
+            other.close()
+        finally:
+            owner.close()
+            owner.unlink()